@@ -12,7 +12,7 @@ from datetime import datetime
 # Agregar src al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from symptoms import SymptomRegistry
+from symptoms import get_default_registry
 from knowledge_base import KnowledgeBase
 from inference_engine import InferenceEngine
 from cases import CaseGenerator
@@ -22,7 +22,7 @@ def exportar_sintomas_csv(output_file='data/symptoms_export.csv'):
     """Exporta todos los síntomas a CSV"""
     print("📊 Exportando síntomas a CSV...")
     
-    registry = SymptomRegistry()
+    registry = get_default_registry()
     symptoms = registry.get_all_symptoms()
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
@@ -33,7 +33,7 @@ def exportar_sintomas_csv(output_file='data/symptoms_export.csv'):
             writer.writerow([
                 symptom.id,
                 symptom.name,
-                symptom.category.value,
+                symptom.category.label,
                 symptom.description,
                 symptom.severity_weight,
                 '; '.join(symptom.common_triggers)
@@ -58,7 +58,7 @@ def generar_estadisticas_sistema():
     print("📊 ESTADÍSTICAS DEL SISTEMA")
     print("="*70)
     
-    registry = SymptomRegistry()
+    registry = get_default_registry()
     kb = KnowledgeBase()
     case_generator = CaseGenerator()
     
@@ -69,7 +69,7 @@ def generar_estadisticas_sistema():
     
     # Por categoría
     from collections import Counter
-    categories = Counter(s.category.value for s in symptoms)
+    categories = Counter(s.category.label for s in symptoms)
     print(f"  Por categoría:")
     for cat, count in categories.most_common():
         print(f"    • {cat}: {count}")
@@ -119,7 +119,7 @@ def validar_consistencia():
     print("🔍 VALIDACIÓN DE CONSISTENCIA")
     print("="*70)
     
-    registry = SymptomRegistry()
+    registry = get_default_registry()
     kb = KnowledgeBase()
     
     issues = []
@@ -203,7 +203,7 @@ def generar_reporte_cobertura():
     print("📊 REPORTE DE COBERTURA")
     print("="*70)
     
-    registry = SymptomRegistry()
+    registry = get_default_registry()
     kb = KnowledgeBase()
     
     # Síntomas usados vs disponibles
@@ -328,7 +328,7 @@ def render_symptom_selector():
             SymptomCategory.OTORRINOLARINGOLOGICO
         ]
         
-        category_names = [cat.value for cat in categories]
+        category_names = [cat.label for cat in categories]
         
         selected_category = st.selectbox(
             "Filtrar por categoría:",
@@ -341,13 +341,9 @@ def render_symptom_selector():
             available_symptoms = symptom_registry.get_all_symptoms()
         else:
             # Buscar el enum que coincida con el valor seleccionado
-            cat_enum = None
-            for cat in categories:
-                if cat.value == selected_category:
-                    cat_enum = cat
-                    break
+            cat_enum = SymptomCategory.from_label(selected_category)
             
-            if cat_enum:
+            if cat_enum is not None:
                 available_symptoms = symptom_registry.get_symptoms_by_category(cat_enum)
             else:
                 available_symptoms = []
@@ -375,7 +371,7 @@ def render_symptom_selector():
         if symptom:
             with st.expander(f"➕ Agregar: {selected_symptom_name}", expanded=True):
                 st.markdown(f"**Descripción:** {symptom.description}")
-                st.markdown(f"**Categoría:** {symptom.category.value}")
+                st.markdown(f"**Categoría:** {symptom.category.label}")
                 
                 col_sev, col_dur = st.columns(2)
                 
@@ -433,7 +429,7 @@ def render_current_symptoms():
         if symptom:
             severity = st.session_state.patient_symptoms.get_severity(symptom_id)
             duration = st.session_state.patient_symptoms.get_duration(symptom_id)
-            notes = st.session_state.patient_symptoms.notes.get(symptom_id, "")
+            notes = st.session_state.patient_symptoms.get_note(symptom_id)
             
             col1, col2, col3 = st.columns([3, 1, 1])
             
@@ -441,7 +437,7 @@ def render_current_symptoms():
                 st.markdown(f"""
                 <div class="symptom-card">
                     <strong>{symptom.name}</strong><br>
-                    <small>{symptom.category.value}</small><br>
+                    <small>{symptom.category.label}</small><br>
                     <em>{notes if notes else symptom.description}</em>
                 </div>
                 """, unsafe_allow_html=True)
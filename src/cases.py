@@ -3,7 +3,7 @@ Módulo de Casos de Prueba Simulados
 Genera casos realistas para validación y demostración del sistema
 """
 
-from typing import List, Dict
+from typing import Dict, Iterator, List
 from dataclasses import dataclass
 import random
 from symptoms import PatientSymptoms, SeverityLevel
@@ -272,6 +272,10 @@ class CaseGenerator:
         """Retorna todos los casos de prueba"""
         return self.cases
     
+    def iter_cases(self) -> Iterator[TestCase]:
+        """Itera los casos de prueba sin copiar la lista"""
+        return iter(self.cases)
+    
     def get_case_by_id(self, case_id: str) -> TestCase:
         """Obtiene un caso específico por ID"""
         for case in self.cases:
@@ -293,7 +297,7 @@ class CaseGenerator:
         for symptom_id in case.patient_symptoms.symptoms:
             severity = case.patient_symptoms.get_severity(symptom_id)
             duration = case.patient_symptoms.get_duration(symptom_id)
-            note = case.patient_symptoms.notes.get(symptom_id, "")
+            note = case.patient_symptoms.get_note(symptom_id)
             
             symptom_list.append({
                 "id": symptom_id,
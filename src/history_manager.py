@@ -367,12 +367,12 @@ def create_symptoms_dict_list(patient_symptoms, symptom_registry) -> List[dict]:
         if symptom:
             severity = patient_symptoms.get_severity(symptom_id)
             duration = patient_symptoms.get_duration(symptom_id)
-            notes = patient_symptoms.notes.get(symptom_id, "")
+            notes = patient_symptoms.get_note(symptom_id)
             
             symptoms_list.append({
                 'id': symptom_id,
                 'name': symptom.name,
-                'category': symptom.category.value,
+                'category': symptom.category.label,
                 'severity': severity.name if severity else 'N/A',
                 'duration_days': duration,
                 'notes': notes
@@ -3,14 +3,23 @@ Motor de Inferencia para Diagnóstico Médico
 Implementa algoritmos de razonamiento forward y backward chaining
 """
 
-from typing import List, Dict, Tuple, Optional, Set
-from dataclasses import dataclass, field
+from typing import List, Dict, FrozenSet, Tuple, Optional, Set
+from dataclasses import dataclass, field, replace
+from collections import Counter, OrderedDict
 import math
+
+import numpy as np
+
 from symptoms import PatientSymptoms, SymptomRegistry, SeverityLevel
-from knowledge_base import KnowledgeBase, Disease, Urgency
+from knowledge_base import KnowledgeBase, Disease, RuleMatrix, Urgency
+from numba_kernels import score_diseases as _jit_score_diseases
+
 
+# Máximo de resultados memorizados por tipo de consulta en cada motor
+_CACHE_SIZE = 256
 
-@dataclass
+
+@dataclass(slots=True)
 class DiagnosisResult:
     """Resultado de un diagnóstico"""
     disease: Disease
@@ -25,6 +34,26 @@ class DiagnosisResult:
         return self.confidence < other.confidence
 
 
+@dataclass(slots=True)
+class DiagnosisBundle:
+    """Diagnóstico completo de un paciente"""
+    results: List[DiagnosisResult]
+    differential: List[str]
+    suggestions: List[str]
+    patterns: Dict[str, any]
+
+
+@dataclass(slots=True)
+class _Ranking:
+    """Clasificación memorizada de las enfermedades para un paciente"""
+    disease_ids: Tuple[str, ...]
+    # Confianza antes y después de normalizar, en orden descendente
+    raw_confidences: np.ndarray
+    confidences: np.ndarray
+    # Resultados ya construidos (prefijo de la clasificación)
+    results: List[DiagnosisResult] = field(default_factory=list)
+
+
 class InferenceEngine:
     """Motor de inferencia para diagnóstico médico"""
     
@@ -41,6 +70,50 @@ class InferenceEngine:
         # Umbrales
         self.MIN_CONFIDENCE_THRESHOLD = 0.25
         self.HIGH_CONFIDENCE_THRESHOLD = 0.70
+        
+        # Resultados memorizados por firma del paciente (LRU). Se invalidan al
+        # cambiar los pesos o umbrales anteriores, la matriz de reglas (que
+        # register_disease descarta) o el vector de pesos del registro. Editar
+        # en sitio los conjuntos de reglas de una Disease no se detecta: tras
+        # hacerlo, volver a registrarla o llamar a cache_clear()
+        self._diagnosis_cache: OrderedDict = OrderedDict()
+        self._backward_cache: OrderedDict = OrderedDict()
+        self._patterns_cache: OrderedDict = OrderedDict()
+        self._cache_token = None
+    
+    def cache_clear(self):
+        """Descarta los resultados memorizados (p. ej. tras editar reglas en sitio)"""
+        self._diagnosis_cache.clear()
+        self._backward_cache.clear()
+        self._patterns_cache.clear()
+        self._cache_token = None
+    
+    def _parameters(self) -> Tuple[float, ...]:
+        """Pesos y umbrales actuales del motor (parte de la clave de la caché)"""
+        return (self.WEIGHT_REQUIRED, self.WEIGHT_COMMON, self.WEIGHT_OPTIONAL,
+                self.WEIGHT_EXCLUDING, self.MIN_CONFIDENCE_THRESHOLD,
+                self.HIGH_CONFIDENCE_THRESHOLD)
+    
+    def _memoized(self, cache: OrderedDict, key, compute):
+        """Obtiene un resultado memorizado o lo calcula y lo guarda"""
+        weights = self.registry.get_weight_vector()
+        matrix = self.kb.get_rule_matrix()
+        params = self._parameters()
+        token = self._cache_token
+        if (token is None or token[0] is not weights or token[1] is not matrix
+                or token[2] != params):
+            self.cache_clear()
+            self._cache_token = (weights, matrix, params)
+        
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache[key] = value
+            if len(cache) > _CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return value
     
     def diagnose(self, patient_symptoms: PatientSymptoms, 
                 max_results: int = 5) -> List[DiagnosisResult]:
@@ -48,59 +121,146 @@ class InferenceEngine:
         Realiza el diagnóstico basado en los síntomas del paciente
         Utiliza forward chaining para evaluar todas las enfermedades
         """
-        results = []
+        # Se memoriza la clasificación completa: cualquier max_results la
+        # reutiliza y solo se construyen los resultados pedidos (una vez).
+        # Se devuelven copias porque los resultados son mutables
+        ranking = self._memoized(
+            self._diagnosis_cache, patient_symptoms.get_signature(),
+            lambda: self._rank_diseases(patient_symptoms)
+        )
         
-        for disease in self.kb.get_all_diseases():
-            # Calcular confianza para cada enfermedad
-            diagnosis = self._evaluate_disease(disease, patient_symptoms)
-            
-            # Solo incluir si supera el umbral mínimo
-            if diagnosis.confidence >= self.MIN_CONFIDENCE_THRESHOLD:
-                results.append(diagnosis)
+        wanted = len(range(len(ranking.disease_ids))[:max_results])
+        built = ranking.results
+        if len(built) < wanted:
+            patient_set = frozenset(patient_symptoms.symptoms)
+            for position in range(len(built), wanted):
+                # Explicación y riesgo usan la confianza previa a la normalización
+                result = self._build_result(
+                    self.kb.get_disease(ranking.disease_ids[position]), patient_symptoms,
+                    patient_set, float(ranking.raw_confidences[position])
+                )
+                result.confidence = float(ranking.confidences[position])
+                built.append(result)
+        return [
+            replace(result, matched_symptoms=set(result.matched_symptoms),
+                    missing_key_symptoms=set(result.missing_key_symptoms))
+            for result in built[:wanted]
+        ]
+    
+    def _rank_diseases(self, patient_symptoms: PatientSymptoms) -> "_Ranking":
+        """Puntúa todas las enfermedades, las ordena y normaliza las confianzas"""
+        matrix = self.kb.get_rule_matrix()
+        confidences = self._score_diseases(patient_symptoms, matrix)
+        
+        # Solo incluir las que superan el umbral mínimo, ordenadas por
+        # confianza descendente (estable: los empates conservan el orden de la base)
+        selected = np.flatnonzero(confidences >= self.MIN_CONFIDENCE_THRESHOLD)
+        selected = selected[np.argsort(-confidences[selected], kind="stable")]
+        raw = confidences[selected]
+        
+        return _Ranking(
+            disease_ids=tuple(matrix.disease_ids[row] for row in selected),
+            raw_confidences=raw,
+            confidences=self._normalize_confidences(raw),
+        )
+    
+    def _score_diseases(self, patient_symptoms: PatientSymptoms,
+                        matrix: RuleMatrix) -> np.ndarray:
+        """
+        Calcula la confianza de todas las enfermedades a la vez. Equivale a
+        aplicar _evaluate_disease a cada una: los conteos de coincidencias y
+        las sumas de severidad/duración salen de productos matriciales enteros
+        (exactos) y el resto de operaciones se aplican elemento a elemento en float64.
+        """
+        # Columnas por síntoma: presente, severidad, tiene severidad,
+        # duración, tiene duración (> 0)
+        patient = np.zeros((len(matrix.symptom_index), 5), dtype=np.int64)
+        for symptom_id, entry in patient_symptoms.entries.items():
+            position = matrix.symptom_index.get(symptom_id)
+            if position is None:
+                continue
+            row = patient[position]
+            row[0] = 1
+            if entry.severity:
+                row[1] = entry.severity
+                row[2] = 1
+            if entry.duration > 0:
+                row[3] = entry.duration
+                row[4] = 1
+        
+        # Coincidencias de cada tipo de síntoma por enfermedad: (4, D)
+        matches = matrix.membership @ patient[:, 0]
+        required, common, optional, excluding = matches
+        n_required, n_common, n_optional, _ = matrix.sizes
+        # Sumas y conteos de severidad/duración sobre los síntomas clave: (D, 4)
+        totals = matrix.key @ patient[:, 1:]
+        
+        if _jit_score_diseases is not None:
+            # Ruta compilada: mismo cálculo por enfermedad sin arreglos temporales
+            return _jit_score_diseases(matches, matrix.sizes, totals,
+                                       self.WEIGHT_REQUIRED, self.WEIGHT_COMMON,
+                                       self.WEIGHT_OPTIONAL, self.WEIGHT_EXCLUDING)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            required_score = np.where(n_required > 0, required / n_required, 1.0)
+            common_score = np.where(n_common > 0, common / n_common, 0.5)
+            optional_score = np.where(n_optional > 0, optional / n_optional, 0.5)
+        excluding_penalty = excluding * 0.15
+        
+        # Calcular confianza ponderada
+        confidence = (
+            self.WEIGHT_REQUIRED * required_score +
+            self.WEIGHT_COMMON * common_score +
+            self.WEIGHT_OPTIONAL * optional_score -
+            self.WEIGHT_EXCLUDING * excluding_penalty
+        )
         
-        # Ordenar por confianza (descendente)
-        results.sort(reverse=True)
+        # Ajustar por severidad y duración de los síntomas clave
+        confidence *= self._severity_multipliers(totals[:, 0], totals[:, 1])
+        confidence *= self._duration_multipliers(totals[:, 2], totals[:, 3])
         
-        # Normalizar confianzas si es necesario
-        if results:
-            results = self._normalize_confidences(results)
+        # Asegurar que esté en rango [0, 1]
+        confidence = np.clip(confidence, 0.0, 1.0)
         
-        # Retornar top resultados
-        return results[:max_results]
+        # Sin síntomas requeridos principales, confianza muy baja
+        return np.where(required_score < 0.5, required_score * 0.3, confidence)
     
     def _evaluate_disease(self, disease: Disease, 
-                         patient_symptoms: PatientSymptoms) -> DiagnosisResult:
+                         patient_symptoms: PatientSymptoms,
+                         patient_set: Optional[FrozenSet[str]] = None) -> DiagnosisResult:
         """Evalúa una enfermedad específica contra los síntomas del paciente"""
         
-        patient_symptom_ids = patient_symptoms.symptoms
+        if patient_set is None:
+            patient_set = frozenset(patient_symptoms.symptoms)
+        rules = self.kb.get_disease_index()[disease.id]
         
         # Verificar síntomas requeridos
-        required_match = disease.required_symptoms & patient_symptom_ids
-        required_score = (len(required_match) / len(disease.required_symptoms) 
-                         if disease.required_symptoms else 1.0)
+        required_match = rules.required & patient_set
+        required_score = (len(required_match) / len(rules.required) 
+                         if rules.required else 1.0)
         
         # Si no cumple con síntomas requeridos, confianza muy baja
         if required_score < 0.5:
             return DiagnosisResult(
                 disease=disease,
                 confidence=required_score * 0.3,
-                matched_symptoms=required_match,
-                missing_key_symptoms=disease.required_symptoms - patient_symptom_ids,
+                matched_symptoms=set(required_match),
+                missing_key_symptoms=set(rules.required - patient_set),
                 explanation="No cumple con síntomas requeridos principales"
             )
         
         # Verificar síntomas comunes
-        common_match = disease.common_symptoms & patient_symptom_ids
-        common_score = (len(common_match) / len(disease.common_symptoms) 
-                       if disease.common_symptoms else 0.5)
+        common_match = rules.common & patient_set
+        common_score = (len(common_match) / len(rules.common) 
+                       if rules.common else 0.5)
         
         # Verificar síntomas opcionales
-        optional_match = disease.optional_symptoms & patient_symptom_ids
-        optional_score = (len(optional_match) / len(disease.optional_symptoms) 
-                         if disease.optional_symptoms else 0.5)
+        optional_match = rules.optional & patient_set
+        optional_score = (len(optional_match) / len(rules.optional) 
+                         if rules.optional else 0.5)
         
         # Penalizar por síntomas excluyentes
-        excluding_match = disease.excluding_symptoms & patient_symptom_ids
+        excluding_match = rules.excluding & patient_set
         excluding_penalty = len(excluding_match) * 0.15
         
         # Calcular confianza ponderada
@@ -126,6 +286,17 @@ class InferenceEngine:
         # Asegurar que esté en rango [0, 1]
         confidence = max(0.0, min(1.0, confidence))
         
+        return self._build_result(disease, patient_symptoms, patient_set, confidence)
+    
+    def _build_result(self, disease: Disease, patient_symptoms: PatientSymptoms,
+                      patient_set: FrozenSet[str], confidence: float) -> DiagnosisResult:
+        """Construye el resultado (explicación, riesgo) de una enfermedad ya puntuada"""
+        rules = self.kb.get_disease_index()[disease.id]
+        required_match = rules.required & patient_set
+        common_match = rules.common & patient_set
+        optional_match = rules.optional & patient_set
+        excluding_match = rules.excluding & patient_set
+        
         # Determinar nivel de riesgo
         risk_level = self._determine_risk_level(disease, confidence, patient_symptoms)
         
@@ -136,41 +307,58 @@ class InferenceEngine:
         )
         
         # Síntomas clave faltantes
-        missing_key = disease.required_symptoms - patient_symptom_ids
+        missing_key = rules.required - patient_set
         
         return DiagnosisResult(
             disease=disease,
             confidence=confidence,
-            matched_symptoms=required_match | common_match | optional_match,
-            missing_key_symptoms=missing_key,
+            matched_symptoms=set(required_match | common_match | optional_match),
+            missing_key_symptoms=set(missing_key),
             explanation=explanation,
             risk_level=risk_level
         )
     
+    @staticmethod
+    def _severity_multipliers(total_severity, count):
+        """
+        Multiplicador de severidad a partir de la suma y el número de
+        severidades (escalares o arreglos, una entrada por enfermedad)
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_severity = np.divide(total_severity, count)
+        # Normalizar: severidad promedio de 2.0 = multiplicador 1.0
+        # Mayor severidad aumenta confianza
+        multiplier = np.clip(0.8 + (avg_severity - 1) * 0.15, 0.7, 1.3)
+        return np.where(np.greater(count, 0), multiplier, 1.0)
+    
+    @staticmethod
+    def _duration_multipliers(total_duration, count):
+        """
+        Multiplicador de duración a partir de la suma y el número de
+        duraciones positivas (escalares o arreglos)
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_duration = np.divide(total_duration, count)
+        # Síntomas de 3-7 días = multiplicador óptimo
+        # Muy cortos o muy largos pueden reducir confianza; síntomas muy
+        # prolongados pueden indicar otra condición
+        return np.select(
+            [np.equal(count, 0), avg_duration < 1, avg_duration <= 7],
+            [1.0, 0.85, 1.0 + (avg_duration - 1) * 0.02],
+            1.1 - (avg_duration - 7) * 0.015,
+        )
+    
     def _calculate_severity_multiplier(self, patient_symptoms: PatientSymptoms,
                                        matched_symptoms: Set[str]) -> float:
         """Calcula multiplicador basado en severidad de síntomas"""
         if not matched_symptoms:
             return 1.0
         
-        total_severity = 0
-        count = 0
-        
-        for symptom_id in matched_symptoms:
-            severity = patient_symptoms.get_severity(symptom_id)
-            if severity:
-                total_severity += severity.value
-                count += 1
-        
-        if count == 0:
-            return 1.0
-        
-        avg_severity = total_severity / count
-        
-        # Normalizar: severidad promedio de 2.0 = multiplicador 1.0
-        # Mayor severidad aumenta confianza
-        multiplier = 0.8 + (avg_severity - 1) * 0.15
-        return max(0.7, min(1.3, multiplier))
+        severities = np.fromiter(
+            (patient_symptoms.get_severity(symptom_id) or 0 for symptom_id in matched_symptoms),
+            dtype=np.int64, count=len(matched_symptoms)
+        )
+        return float(self._severity_multipliers(severities.sum(), np.count_nonzero(severities)))
     
     def _calculate_duration_multiplier(self, patient_symptoms: PatientSymptoms,
                                       matched_symptoms: Set[str]) -> float:
@@ -178,31 +366,12 @@ class InferenceEngine:
         if not matched_symptoms:
             return 1.0
         
-        total_duration = 0
-        count = 0
-        
-        for symptom_id in matched_symptoms:
-            duration = patient_symptoms.get_duration(symptom_id)
-            if duration > 0:
-                total_duration += duration
-                count += 1
-        
-        if count == 0:
-            return 1.0
-        
-        avg_duration = total_duration / count
-        
-        # Síntomas de 3-7 días = multiplicador óptimo
-        # Muy cortos o muy largos pueden reducir confianza
-        if avg_duration < 1:
-            return 0.85
-        elif avg_duration <= 7:
-            return 1.0 + (avg_duration - 1) * 0.02
-        else:
-            # Síntomas muy prolongados pueden indicar otra condición
-            return 1.1 - (avg_duration - 7) * 0.015
-        
-        return max(0.8, min(1.15, multiplier))
+        durations = np.fromiter(
+            (patient_symptoms.get_duration(symptom_id) for symptom_id in matched_symptoms),
+            dtype=np.int64, count=len(matched_symptoms)
+        )
+        positive = durations > 0
+        return float(self._duration_multipliers(durations[positive].sum(), np.count_nonzero(positive)))
     
     def _determine_risk_level(self, disease: Disease, confidence: float,
                              patient_symptoms: PatientSymptoms) -> str:
@@ -235,22 +404,19 @@ class InferenceEngine:
         
         # Síntomas requeridos
         if required_match:
-            req_names = [self.registry.get_symptom(s).name 
-                        for s in required_match if self.registry.get_symptom(s)]
+            req_names = self.registry.get_symptom_names(required_match)
             if req_names:
                 parts.append(f"Presenta síntomas clave: {', '.join(req_names)}")
         
         # Síntomas comunes
         if common_match:
-            common_names = [self.registry.get_symptom(s).name 
-                          for s in common_match if self.registry.get_symptom(s)]
+            common_names = self.registry.get_symptom_names(common_match)
             if common_names:
                 parts.append(f"Síntomas comunes presentes: {', '.join(common_names)}")
         
         # Síntomas excluyentes
         if excluding_match:
-            excl_names = [self.registry.get_symptom(s).name 
-                         for s in excluding_match if self.registry.get_symptom(s)]
+            excl_names = self.registry.get_symptom_names(excluding_match)
             if excl_names:
                 parts.append(f"Presenta síntomas atípicos: {', '.join(excl_names)}")
         
@@ -266,27 +432,23 @@ class InferenceEngine:
         
         return ". ".join(parts) + "."
     
-    def _normalize_confidences(self, results: List[DiagnosisResult]) -> List[DiagnosisResult]:
+    def _normalize_confidences(self, confidences: np.ndarray) -> np.ndarray:
         """
-        Normaliza las confianzas para que sumen aproximadamente 1.0
+        Normaliza las confianzas (ordenadas) para que sumen aproximadamente 1.0
         pero manteniendo las proporciones relativas
         """
-        if not results:
-            return results
-        
-        total = sum(r.confidence for r in results)
+        # Suma en el mismo orden que la acumulación original en Python
+        total = sum(confidences.tolist())
         
         if total > 0:
             # Factor de normalización suave
             factor = 1.0 / total
-            # Aplicar normalización parcial para no perder información
-            for result in results:
-                original = result.confidence
-                normalized = original * factor
-                # Mezclar 70% normalizado + 30% original
-                result.confidence = 0.7 * normalized + 0.3 * original
-        
-        return results
+            # Aplicar normalización parcial para no perder información:
+            # mezclar 70% normalizado + 30% original
+            normalized = confidences * factor
+            return 0.7 * normalized + 0.3 * confidences
+        
+        return confidences
     
     def backward_chain(self, target_disease_id: str,
                       patient_symptoms: PatientSymptoms) -> Tuple[bool, str]:
@@ -294,32 +456,40 @@ class InferenceEngine:
         Backward chaining: Verifica si los síntomas pueden llevar a una enfermedad específica
         Retorna (es_posible, explicación)
         """
-        disease = self.kb.get_disease(target_disease_id)
-        if not disease:
+        return self._memoized(
+            self._backward_cache, (target_disease_id, patient_symptoms.get_signature()),
+            lambda: self._backward_chain(target_disease_id, patient_symptoms)
+        )
+    
+    def _backward_chain(self, target_disease_id: str,
+                       patient_symptoms: PatientSymptoms) -> Tuple[bool, str]:
+        """Evalúa una enfermedad objetivo con backward chaining"""
+        # El índice de reglas basta para todas las comprobaciones; cada rechazo
+        # retorna en cuanto se detecta, sin calcular el resto de la explicación
+        rules = self.kb.get_disease_index().get(target_disease_id)
+        if rules is None:
             return False, "Enfermedad no encontrada en la base de conocimiento"
         
-        patient_symptom_ids = patient_symptoms.symptoms
+        patient_set = frozenset(patient_symptoms.symptoms)
         
         # Verificar síntomas requeridos
-        missing_required = disease.required_symptoms - patient_symptom_ids
+        missing_required = rules.required - patient_set
         if missing_required:
-            missing_names = [self.registry.get_symptom(s).name 
-                           for s in missing_required if self.registry.get_symptom(s)]
+            missing_names = self.registry.get_symptom_names(missing_required)
             return False, (f"Faltan síntomas requeridos: {', '.join(missing_names)}. "
                           "No es posible este diagnóstico.")
         
         # Verificar síntomas excluyentes
-        present_excluding = disease.excluding_symptoms & patient_symptom_ids
+        present_excluding = rules.excluding & patient_set
         if present_excluding:
-            excl_names = [self.registry.get_symptom(s).name 
-                         for s in present_excluding if self.registry.get_symptom(s)]
+            excl_names = self.registry.get_symptom_names(present_excluding)
             return False, (f"Presenta síntomas que excluyen este diagnóstico: "
                           f"{', '.join(excl_names)}")
         
         # Calcular qué porcentaje de síntomas comunes están presentes
-        common_match = disease.common_symptoms & patient_symptom_ids
-        common_percentage = (len(common_match) / len(disease.common_symptoms) * 100 
-                           if disease.common_symptoms else 0)
+        common_match = rules.common & patient_set
+        common_percentage = (len(common_match) / len(rules.common) * 100 
+                           if rules.common else 0)
         
         explanation = (f"Es posible. Cumple con todos los síntomas requeridos. "
                       f"Presenta {common_percentage:.0f}% de síntomas comunes. "
@@ -331,8 +501,11 @@ class InferenceEngine:
         """
         Genera un diagnóstico diferencial (lista de posibilidades a considerar)
         """
-        all_results = self.diagnose(patient_symptoms, max_results=10)
-        
+        return self._format_differential(self.diagnose(patient_symptoms, max_results=10))
+    
+    @staticmethod
+    def _format_differential(all_results: List[DiagnosisResult]) -> List[str]:
+        """Formatea los resultados probables como diagnóstico diferencial"""
         differential = []
         for result in all_results:
             if result.confidence >= 0.3:
@@ -342,6 +515,22 @@ class InferenceEngine:
         
         return differential if differential else ["No se encontraron diagnósticos probables"]
     
+    def diagnose_full(self, patient_symptoms: PatientSymptoms,
+                      max_results: int = 5) -> "DiagnosisBundle":
+        """
+        Realiza el diagnóstico completo (resultados, diagnóstico diferencial,
+        pruebas sugeridas y patrones) evaluando al paciente una sola vez
+        """
+        # Los resultados y el diferencial (top 10) comparten la misma
+        # clasificación memorizada: las enfermedades se puntúan una sola vez
+        results = self.diagnose(patient_symptoms, max_results=max_results)
+        return DiagnosisBundle(
+            results=results,
+            differential=self._format_differential(self.diagnose(patient_symptoms, max_results=10)),
+            suggestions=self.suggest_additional_tests(results),
+            patterns=self.analyze_symptom_patterns(patient_symptoms),
+        )
+    
     def suggest_additional_tests(self, diagnosis_results: List[DiagnosisResult]) -> List[str]:
         """Sugiere pruebas o evaluaciones adicionales basadas en los diagnósticos"""
         
@@ -373,32 +562,45 @@ class InferenceEngine:
     
     def analyze_symptom_patterns(self, patient_symptoms: PatientSymptoms) -> Dict[str, any]:
         """Analiza patrones en los síntomas del paciente"""
-        
-        from collections import Counter
+        patterns = self._memoized(
+            self._patterns_cache, patient_symptoms.get_signature(),
+            lambda: self._analyze_symptom_patterns(patient_symptoms)
+        )
+        # Copiar los contenedores mutables del resultado memorizado
+        return {
+            **patterns,
+            "category_distribution": dict(patterns["category_distribution"]),
+            "chronic_symptoms": list(patterns["chronic_symptoms"]),
+        }
+    
+    def _analyze_symptom_patterns(self, patient_symptoms: PatientSymptoms) -> Dict[str, any]:
+        """Calcula los patrones de síntomas del paciente"""
         
         categories = Counter()
         total_severity = 0
         chronic_symptoms = []
+        get_symptom = self.registry.get_symptom
         
-        for symptom_id in patient_symptoms.symptoms:
-            symptom = self.registry.get_symptom(symptom_id)
+        # Una sola pasada sobre los registros del paciente: categoría,
+        # severidad y duración salen del mismo registro
+        for symptom_id, entry in patient_symptoms.entries.items():
+            symptom = get_symptom(symptom_id)
             if symptom:
-                categories[symptom.category.value] += 1
+                categories[symptom.category.label] += 1
                 
-                severity = patient_symptoms.get_severity(symptom_id)
-                if severity:
-                    total_severity += severity.value
+                if entry.severity:
+                    total_severity += entry.severity
                 
-                duration = patient_symptoms.get_duration(symptom_id)
-                if duration > 14:
+                if entry.duration > 14:
                     chronic_symptoms.append(symptom.name)
         
-        avg_severity = total_severity / len(patient_symptoms.symptoms) if patient_symptoms.symptoms else 0
+        total_symptoms = len(patient_symptoms.entries)
+        avg_severity = total_severity / total_symptoms if total_symptoms else 0
         
         return {
             "dominant_category": categories.most_common(1)[0][0] if categories else "N/A",
             "category_distribution": dict(categories),
             "average_severity": avg_severity,
             "chronic_symptoms": chronic_symptoms,
-            "total_symptoms": len(patient_symptoms.symptoms)
+            "total_symptoms": total_symptoms
         }
\ No newline at end of file
@@ -4,9 +4,12 @@ Sistema Experto para Diagnóstico Preliminar
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Optional, Tuple
+from typing import Dict, FrozenSet, List, Set, Optional, TextIO, Tuple, Union
 from enum import Enum
 import json
+import sys
+
+import numpy as np
 
 
 class DiseaseSeverity(Enum):
@@ -67,11 +70,42 @@ class Disease:
         return hash(self.id)
 
 
+@dataclass(slots=True, frozen=True)
+class DiseaseIndex:
+    """Reglas de diagnóstico de una enfermedad como conjuntos inmutables"""
+    required: FrozenSet[str]
+    common: FrozenSet[str]
+    optional: FrozenSet[str]
+    excluding: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class RuleMatrix:
+    """
+    Reglas de todas las enfermedades como matrices de pertenencia de forma
+    (enfermedades, síntomas), para evaluarlas con productos matriciales. Los
+    pesos son 0/1, así que se guardan en int8 sin pérdida de precisión
+    """
+    disease_ids: Tuple[str, ...]
+    symptom_index: Dict[str, int]
+    # Pertenencia requerido/común/opcional/excluyente apilada: (4, D, S)
+    membership: np.ndarray
+    # Síntomas clave (requeridos o comunes) de cada enfermedad: (D, S)
+    key: np.ndarray
+    # Número de síntomas de cada tipo por enfermedad: (4, D)
+    sizes: np.ndarray
+
+
 class KnowledgeBase:
     """Base de conocimiento médico con reglas de diagnóstico"""
     
     def __init__(self):
         self.diseases: Dict[str, Disease] = {}
+        # Índice de reglas por enfermedad; se construye al primer uso y se
+        # descarta al registrar una enfermedad
+        self._index: Optional[Dict[str, DiseaseIndex]] = None
+        self._matrix: Optional[RuleMatrix] = None
+        self._all_diseases: Optional[Tuple[Disease, ...]] = None
         self._initialize_knowledge_base()
     
     def _initialize_knowledge_base(self):
@@ -538,22 +572,68 @@ class KnowledgeBase:
     
     def register_disease(self, disease: Disease):
         """Registra una nueva enfermedad en la base de conocimiento"""
-        self.diseases[disease.id] = disease
+        # IDs internados: las comparaciones en dicts y conjuntos se resuelven
+        # por identidad con los IDs internados del registro de síntomas
+        self.diseases[sys.intern(disease.id)] = disease
+        self._index = None
+        self._matrix = None
+        self._all_diseases = None
+    
+    def get_disease_index(self) -> Dict[str, DiseaseIndex]:
+        """Obtiene las reglas de todas las enfermedades como conjuntos inmutables"""
+        if self._index is None:
+            intern = sys.intern
+            self._index = {
+                disease_id: DiseaseIndex(
+                    required=frozenset(map(intern, disease.required_symptoms)),
+                    common=frozenset(map(intern, disease.common_symptoms)),
+                    optional=frozenset(map(intern, disease.optional_symptoms)),
+                    excluding=frozenset(map(intern, disease.excluding_symptoms)),
+                )
+                for disease_id, disease in self.diseases.items()
+            }
+        return self._index
+    
+    def get_rule_matrix(self) -> RuleMatrix:
+        """Obtiene las reglas de todas las enfermedades en forma matricial"""
+        if self._matrix is None:
+            index = self.get_disease_index()
+            disease_ids = tuple(index)
+            symptom_index: Dict[str, int] = {}
+            for rules in index.values():
+                for symptom_id in sorted(rules.required | rules.common | rules.optional | rules.excluding):
+                    symptom_index.setdefault(symptom_id, len(symptom_index))
+            
+            membership = np.zeros((4, len(disease_ids), len(symptom_index)), dtype=np.int8)
+            for row, rules in enumerate(index.values()):
+                for kind, symptom_ids in enumerate((rules.required, rules.common,
+                                                    rules.optional, rules.excluding)):
+                    for symptom_id in symptom_ids:
+                        membership[kind, row, symptom_index[symptom_id]] = 1
+            
+            key = np.maximum(membership[0], membership[1])
+            sizes = membership.sum(axis=2, dtype=np.int64)
+            for array in (membership, key, sizes):
+                array.flags.writeable = False
+            self._matrix = RuleMatrix(disease_ids, symptom_index, membership, key, sizes)
+        return self._matrix
     
     def get_disease(self, disease_id: str) -> Optional[Disease]:
         """Obtiene una enfermedad por su ID"""
         return self.diseases.get(disease_id)
     
-    def get_all_diseases(self) -> List[Disease]:
+    def get_all_diseases(self) -> Tuple[Disease, ...]:
         """Obtiene todas las enfermedades registradas"""
-        return list(self.diseases.values())
+        if self._all_diseases is None:
+            self._all_diseases = tuple(self.diseases.values())
+        return self._all_diseases
     
     def get_diseases_by_category(self, category: str) -> List[Disease]:
         """Obtiene enfermedades de una categoría específica"""
         return [d for d in self.diseases.values() if d.category == category]
     
-    def export_to_json(self, filepath: str):
-        """Exporta la base de conocimiento a JSON"""
+    def export_to_json(self, filepath: Union[str, TextIO]):
+        """Exporta la base de conocimiento a JSON (ruta o archivo de texto abierto)"""
         data = {}
         for disease_id, disease in self.diseases.items():
             data[disease_id] = {
@@ -571,5 +651,9 @@ class KnowledgeBase:
                 "contagious": disease.contagious
             }
         
+        if hasattr(filepath, 'write'):
+            json.dump(data, filepath, indent=2, ensure_ascii=False)
+            return
+        
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Núcleos compilados con Numba
+Sistema Experto para Diagnóstico Médico Preliminar
+
+Numba es opcional: si no está instalado, los núcleos son None y
+SymptomRegistry e InferenceEngine usan la ruta NumPy.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    # Compilación perezosa con caché en disco: solo la primera ejecución
+    # compila, y una firma explícita no aceptaría las matrices de solo
+    # lectura del registro y de la base de conocimiento
+    @njit(cache=True)
+    def accumulate_scores(rows, columns, severities, weights, n_patients):
+        """Acumula peso * severidad por paciente en una sola pasada"""
+        scores = np.zeros(n_patients, dtype=np.float64)
+        for k in range(rows.shape[0]):
+            scores[rows[k]] += weights[columns[k]] * severities[k]
+        return scores
+    
+    @njit(cache=True)
+    def score_diseases(matches, sizes, totals, w_required, w_common, w_optional, w_excluding):
+        """
+        Calcula la confianza de cada enfermedad a partir de los conteos de
+        coincidencias (4, D), los tamaños de sus reglas (4, D) y las sumas y
+        conteos de severidad/duración de sus síntomas clave (D, 4)
+        """
+        n_diseases = matches.shape[1]
+        scores = np.empty(n_diseases, dtype=np.float64)
+        for d in range(n_diseases):
+            required_score = matches[0, d] / sizes[0, d] if sizes[0, d] > 0 else 1.0
+            if required_score < 0.5:
+                # Sin síntomas requeridos principales, confianza muy baja
+                scores[d] = required_score * 0.3
+                continue
+            common_score = matches[1, d] / sizes[1, d] if sizes[1, d] > 0 else 0.5
+            optional_score = matches[2, d] / sizes[2, d] if sizes[2, d] > 0 else 0.5
+            excluding_penalty = matches[3, d] * 0.15
+            
+            confidence = (
+                w_required * required_score +
+                w_common * common_score +
+                w_optional * optional_score -
+                w_excluding * excluding_penalty
+            )
+            
+            if totals[d, 1] > 0:
+                avg_severity = totals[d, 0] / totals[d, 1]
+                multiplier = 0.8 + (avg_severity - 1) * 0.15
+                confidence *= min(1.3, max(0.7, multiplier))
+            
+            if totals[d, 3] > 0:
+                avg_duration = totals[d, 2] / totals[d, 3]
+                if avg_duration < 1:
+                    confidence *= 0.85
+                elif avg_duration <= 7:
+                    confidence *= 1.0 + (avg_duration - 1) * 0.02
+                else:
+                    confidence *= 1.1 - (avg_duration - 7) * 0.015
+            
+            scores[d] = min(1.0, max(0.0, confidence))
+        return scores
+else:
+    accumulate_scores = None
+    score_diseases = None
+
+
+NUMBA_AVAILABLE = njit is not None
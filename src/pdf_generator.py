@@ -237,7 +237,7 @@ class PDFGenerator:
             if symptom:
                 severity = patient_symptoms.get_severity(symptom_id)
                 duration = patient_symptoms.get_duration(symptom_id)
-                notes = patient_symptoms.notes.get(symptom_id, '-')
+                notes = patient_symptoms.get_note(symptom_id, '-')
                 
                 data.append([
                     symptom.name,
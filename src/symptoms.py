@@ -3,12 +3,22 @@ Módulo de Gestión de Síntomas
 Sistema Experto para Diagnóstico Médico Preliminar
 """
 
-from enum import Enum
-from typing import Dict, List, Set, Optional
+import functools
+import json
+import os
+import re
+import sys
+from enum import IntEnum
+from types import MappingProxyType
+from typing import ClassVar, Dict, FrozenSet, Iterable, KeysView, List, Mapping, Sequence, Set, Tuple, Optional
 from dataclasses import dataclass, field
 
+import numpy as np
 
-class SeverityLevel(Enum):
+from numba_kernels import accumulate_scores as _jit_accumulate_scores
+
+
+class SeverityLevel(IntEnum):
     """Niveles de severidad de síntomas"""
     LEVE = 1
     MODERADO = 2
@@ -16,21 +26,47 @@ class SeverityLevel(Enum):
     CRITICO = 4
 
 
-class SymptomCategory(Enum):
-    """Categorías de síntomas"""
-    RESPIRATORIO = "Respiratorio"
-    DIGESTIVO = "Digestivo"
-    NEUROLOGICO = "Neurológico"
-    DERMATOLOGICO = "Dermatológico"
-    CARDIOVASCULAR = "Cardiovascular"
-    MUSCULAR = "Muscular"
-    GENERAL = "General"
-    URINARIO = "Urinario"
-    OFTALMOLOGICO = "Oftalmológico"
-    OTORRINOLARINGOLOGICO = "Otorrinolaringológico"
+class SymptomCategory(IntEnum):
+    """Categorías de síntomas (valor entero denso y etiqueta legible)"""
+    RESPIRATORIO = 0, "Respiratorio"
+    DIGESTIVO = 1, "Digestivo"
+    NEUROLOGICO = 2, "Neurológico"
+    DERMATOLOGICO = 3, "Dermatológico"
+    CARDIOVASCULAR = 4, "Cardiovascular"
+    MUSCULAR = 5, "Muscular"
+    GENERAL = 6, "General"
+    URINARIO = 7, "Urinario"
+    OFTALMOLOGICO = 8, "Oftalmológico"
+    OTORRINOLARINGOLOGICO = 9, "Otorrinolaringológico"
+    
+    def __new__(cls, value: int, label: str):
+        member = int.__new__(cls, value)
+        member._value_ = value
+        member.label = label
+        return member
+    
+    @classmethod
+    def from_label(cls, label: str) -> Optional["SymptomCategory"]:
+        """Obtiene la categoría a partir de su etiqueta legible"""
+        return _CATEGORIES_BY_LABEL.get(label)
+
+
+# Índice etiqueta -> categoría
+_CATEGORIES_BY_LABEL = {category.label: category for category in SymptomCategory}
 
 
-@dataclass
+# Síntomas suplementarios: pueden aparecer como relacionados (o en las reglas de
+# la base de conocimiento) aunque no estén registrados en el catálogo principal
+SUPPLEMENTARY_SYMPTOM_IDS = frozenset({
+    "DIFICULTAD_TRAGAR", "DOLOR_FACIAL", "PRESION_FACIAL", "DOLOR_DENTAL",
+    "MAL_ALIENTO", "FOTOFOBIA", "SENSIBILIDAD_SONIDO", "URGENCIA_URINARIA",
+    "ORINA_TURBIA", "DOLOR_ABDOMINAL_BAJO", "PICAZON_OJOS", "LAGRIMEO",
+    "SECRECION_OCULAR", "PICAZON_NARIZ", "REGURGITACION", "GASES",
+    "PERDIDA_PESO", "DESHIDRATACION", "RIGIDEZ", "ENROJECIMIENTO",
+})
+
+
+@dataclass(slots=True, frozen=True, eq=False)
 class Symptom:
     """Clase que representa un síntoma individual"""
     id: str
@@ -38,8 +74,18 @@ class Symptom:
     category: SymptomCategory
     description: str
     severity_weight: float = 1.0
-    common_triggers: List[str] = field(default_factory=list)
-    related_symptoms: Set[str] = field(default_factory=set)
+    # Contenedores inmutables: los valores por defecto se comparten entre instancias
+    common_triggers: Tuple[str, ...] = ()
+    related_symptoms: FrozenSet[str] = frozenset()
+    
+    def __post_init__(self):
+        # ID internado: las búsquedas en dicts y sets comparan por identidad
+        object.__setattr__(self, "id", sys.intern(self.id))
+        # Normalizar contenedores mutables recibidos por el constructor
+        if not isinstance(self.common_triggers, tuple):
+            object.__setattr__(self, "common_triggers", tuple(self.common_triggers))
+        if not isinstance(self.related_symptoms, frozenset):
+            object.__setattr__(self, "related_symptoms", frozenset(self.related_symptoms))
     
     def __hash__(self):
         return hash(self.id)
@@ -50,308 +96,596 @@ class Symptom:
         return False
 
 
+# Definiciones del catálogo de síntomas
+SYMPTOM_DATA_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "symptoms.json"
+)
+
+def _build_symptom_catalog(records: Iterable[Dict]) -> Tuple[Symptom, ...]:
+    """
+    Construye el catálogo de síntomas a partir de sus registros. Los IDs se
+    internan en Symptom y los conjuntos de relacionados iguales se comparten
+    entre síntomas
+    """
+    related_sets: Dict[FrozenSet[str], FrozenSet[str]] = {}
+    
+    def build_symptom(record: Dict) -> Symptom:
+        related = frozenset(map(sys.intern, record["related_symptoms"]))
+        return Symptom(
+            record["id"], record["name"], SymptomCategory[record["category"]],
+            record["description"], record["severity_weight"],
+            record["common_triggers"], related_sets.setdefault(related, related)
+        )
+    
+    # Un solo recorrido sin listas intermedias: el map alimenta la tupla final
+    return tuple(map(build_symptom, records))
+
+
+def _load_symptom_catalog() -> Tuple[Symptom, ...]:
+    """Carga el catálogo de síntomas desde data/symptoms.json"""
+    with open(SYMPTOM_DATA_FILE, 'r', encoding='utf-8') as f:
+        return _build_symptom_catalog(json.load(f))
+
+
+def _index_catalog(catalog: Tuple[Symptom, ...]) -> Tuple[
+        Dict[str, Symptom], Dict[str, int], Dict[SymptomCategory, Tuple[Symptom, ...]]]:
+    """Indexa el catálogo en una sola pasada: por ID, por posición y por categoría"""
+    table = {}
+    index = {}
+    by_category: Dict[SymptomCategory, List[Symptom]] = {}
+    for position, symptom in enumerate(catalog):
+        table[symptom.id] = symptom
+        index[symptom.id] = position
+        by_category.setdefault(symptom.category, []).append(symptom)
+    return table, index, {c: tuple(s) for c, s in by_category.items()}
+
+
+@functools.cache
+def _catalog_tables():
+    """
+    Carga e indexa el catálogo base la primera vez que se necesita (no al
+    importar el módulo). Las instancias de SymptomRegistry copian estas
+    tablas en lugar de reconstruir los síntomas.
+    """
+    catalog = _load_symptom_catalog()
+    table, index, by_category = _index_catalog(catalog)
+    weights = np.array([symptom.severity_weight for symptom in catalog], dtype=np.float64)
+    weights.flags.writeable = False
+    return catalog, table, index, by_category, weights, MappingProxyType(table)
+
+
+# Palabras para el índice de búsqueda de síntomas
+_WORD_RE = re.compile(r"\w+")
+
+# Máximo de consultas memorizadas por registro (se vacía al llenarse)
+_SEARCH_CACHE_SIZE = 256
+
+
 class SymptomRegistry:
     """Registro central de todos los síntomas disponibles"""
     
-    def __init__(self):
-        self.symptoms: Dict[str, Symptom] = {}
-        self._initialize_symptoms()
+    __slots__ = (
+        "symptoms", "_symptoms", "_related", "_ordered", "_index", "_weights",
+        "_related_masks", "_by_trigger", "_lowered", "_by_fragment", "_by_category",
+        "_related_indptr", "_related_indices", "_all_symptoms", "_owns_tables",
+        "_category_masks", "_known_ids", "_search_cache",
+    )
     
-    def _initialize_symptoms(self):
-        """Inicializa la base de datos completa de síntomas"""
-        
-        # Síntomas Respiratorios
-        respiratory_symptoms = [
-            Symptom("TOS_SECA", "Tos seca", SymptomCategory.RESPIRATORIO,
-                   "Tos sin producción de flema", 1.2,
-                   ["irritación", "aire seco"],
-                   {"TOS_PRODUCTIVA", "DOLOR_GARGANTA"}),
-            
-            Symptom("TOS_PRODUCTIVA", "Tos con flema", SymptomCategory.RESPIRATORIO,
-                   "Tos con expectoración de mucosidad", 1.5,
-                   ["infección", "tabaquismo"],
-                   {"TOS_SECA", "CONGESTION_NASAL", "DIFICULTAD_RESPIRAR"}),
-            
-            Symptom("DIFICULTAD_RESPIRAR", "Dificultad para respirar", SymptomCategory.RESPIRATORIO,
-                   "Sensación de falta de aire o respiración laboriosa", 2.5,
-                   ["ejercicio", "estrés", "asma"],
-                   {"TOS_PRODUCTIVA", "DOLOR_PECHO", "FATIGA"}),
-            
-            Symptom("CONGESTION_NASAL", "Congestión nasal", SymptomCategory.RESPIRATORIO,
-                   "Nariz tapada o bloqueada", 0.8,
-                   ["resfriado", "alergia"],
-                   {"ESTORNUDOS", "DOLOR_CABEZA", "TOS_PRODUCTIVA"}),
-            
-            Symptom("ESTORNUDOS", "Estornudos frecuentes", SymptomCategory.RESPIRATORIO,
-                   "Episodios repetidos de estornudos", 0.7,
-                   ["alergia", "irritantes"],
-                   {"CONGESTION_NASAL", "PICAZON_NARIZ"}),
-            
-            Symptom("DOLOR_GARGANTA", "Dolor de garganta", SymptomCategory.OTORRINOLARINGOLOGICO,
-                   "Dolor, irritación o picazón en la garganta", 1.3,
-                   ["virus", "bacteria"],
-                   {"TOS_SECA", "FIEBRE", "DIFICULTAD_TRAGAR"}),
-            
-            Symptom("SIBILANCIAS", "Sibilancias", SymptomCategory.RESPIRATORIO,
-                   "Silbidos al respirar", 2.0,
-                   ["asma", "bronquitis"],
-                   {"DIFICULTAD_RESPIRAR", "TOS_PRODUCTIVA"}),
-        ]
-        
-        # Síntomas Digestivos
-        digestive_symptoms = [
-            Symptom("NAUSEAS", "Náuseas", SymptomCategory.DIGESTIVO,
-                   "Sensación de malestar estomacal con ganas de vomitar", 1.4,
-                   ["alimentos", "virus"],
-                   {"VOMITO", "DOLOR_ABDOMINAL", "PERDIDA_APETITO"}),
-            
-            Symptom("VOMITO", "Vómito", SymptomCategory.DIGESTIVO,
-                   "Expulsión forzada del contenido estomacal", 1.8,
-                   ["intoxicación", "virus"],
-                   {"NAUSEAS", "DIARREA", "DESHIDRATACION"}),
-            
-            Symptom("DIARREA", "Diarrea", SymptomCategory.DIGESTIVO,
-                   "Deposiciones líquidas frecuentes", 1.6,
-                   ["infección", "alimentos"],
-                   {"DOLOR_ABDOMINAL", "NAUSEAS", "DESHIDRATACION"}),
-            
-            Symptom("DOLOR_ABDOMINAL", "Dolor abdominal", SymptomCategory.DIGESTIVO,
-                   "Dolor o molestia en el área del abdomen", 1.5,
-                   ["gastritis", "infección"],
-                   {"NAUSEAS", "DIARREA", "ACIDEZ"}),
-            
-            Symptom("ACIDEZ", "Acidez estomacal", SymptomCategory.DIGESTIVO,
-                   "Sensación de ardor en el pecho o garganta", 1.2,
-                   ["comida picante", "estrés"],
-                   {"DOLOR_ABDOMINAL", "REGURGITACION"}),
-            
-            Symptom("ESTRENIMIENTO", "Estreñimiento", SymptomCategory.DIGESTIVO,
-                   "Dificultad para evacuar", 0.9,
-                   ["dieta", "deshidratación"],
-                   {"DOLOR_ABDOMINAL", "HINCHAZON"}),
-            
-            Symptom("HINCHAZON", "Hinchazón abdominal", SymptomCategory.DIGESTIVO,
-                   "Sensación de abdomen distendido", 1.0,
-                   ["gases", "intolerancia"],
-                   {"DOLOR_ABDOMINAL", "GASES"}),
-        ]
-        
-        # Síntomas Generales
-        general_symptoms = [
-            Symptom("FIEBRE", "Fiebre", SymptomCategory.GENERAL,
-                   "Temperatura corporal elevada (>38°C)", 2.0,
-                   ["infección", "inflamación"],
-                   {"ESCALOFRIOS", "SUDORACION", "FATIGA", "DOLOR_CABEZA"}),
-            
-            Symptom("ESCALOFRIOS", "Escalofríos", SymptomCategory.GENERAL,
-                   "Sensación de frío con temblores", 1.5,
-                   ["fiebre", "infección"],
-                   {"FIEBRE", "DOLOR_MUSCULAR"}),
-            
-            Symptom("FATIGA", "Fatiga extrema", SymptomCategory.GENERAL,
-                   "Cansancio intenso y falta de energía", 1.3,
-                   ["infección", "anemia"],
-                   {"DEBILIDAD", "FIEBRE", "DOLOR_MUSCULAR"}),
-            
-            Symptom("SUDORACION", "Sudoración excesiva", SymptomCategory.GENERAL,
-                   "Transpiración anormal o nocturna", 1.1,
-                   ["fiebre", "infección"],
-                   {"FIEBRE", "ESCALOFRIOS"}),
-            
-            Symptom("PERDIDA_APETITO", "Pérdida de apetito", SymptomCategory.GENERAL,
-                   "Falta de deseo de comer", 1.2,
-                   ["infección", "estrés"],
-                   {"NAUSEAS", "FATIGA", "PERDIDA_PESO"}),
-            
-            Symptom("MALESTAR_GENERAL", "Malestar general", SymptomCategory.GENERAL,
-                   "Sensación general de enfermedad", 1.0,
-                   ["virus", "infección"],
-                   {"FATIGA", "FIEBRE", "DOLOR_CABEZA"}),
-        ]
-        
-        # Síntomas Neurológicos
-        neurological_symptoms = [
-            Symptom("DOLOR_CABEZA", "Dolor de cabeza", SymptomCategory.NEUROLOGICO,
-                   "Cefalea de intensidad variable", 1.3,
-                   ["estrés", "deshidratación"],
-                   {"FIEBRE", "CONGESTION_NASAL", "MAREOS"}),
-            
-            Symptom("MAREOS", "Mareos", SymptomCategory.NEUROLOGICO,
-                   "Sensación de vértigo o inestabilidad", 1.5,
-                   ["presión baja", "deshidratación"],
-                   {"DOLOR_CABEZA", "NAUSEAS", "VISION_BORROSA"}),
-            
-            Symptom("CONFUSION", "Confusión mental", SymptomCategory.NEUROLOGICO,
-                   "Dificultad para pensar con claridad", 2.2,
-                   ["fiebre alta", "deshidratación"],
-                   {"FIEBRE", "DOLOR_CABEZA"}),
-        ]
-        
-        # Síntomas Musculares
-        muscular_symptoms = [
-            Symptom("DOLOR_MUSCULAR", "Dolor muscular", SymptomCategory.MUSCULAR,
-                   "Dolor en músculos del cuerpo", 1.4,
-                   ["ejercicio", "virus"],
-                   {"FIEBRE", "FATIGA", "ESCALOFRIOS"}),
-            
-            Symptom("DOLOR_ARTICULAR", "Dolor articular", SymptomCategory.MUSCULAR,
-                   "Dolor en articulaciones", 1.5,
-                   ["inflamación", "sobreesfuerzo"],
-                   {"DOLOR_MUSCULAR", "RIGIDEZ"}),
-            
-            Symptom("DEBILIDAD", "Debilidad muscular", SymptomCategory.MUSCULAR,
-                   "Pérdida de fuerza en músculos", 1.6,
-                   ["fatiga", "enfermedad"],
-                   {"FATIGA", "DOLOR_MUSCULAR"}),
-        ]
-        
-        # Síntomas Dermatológicos
-        dermatological_symptoms = [
-            Symptom("ERUPCION", "Erupción cutánea", SymptomCategory.DERMATOLOGICO,
-                   "Cambios visibles en la piel", 1.7,
-                   ["alergia", "virus"],
-                   {"PICAZON_PIEL", "FIEBRE"}),
-            
-            Symptom("PICAZON_PIEL", "Picazón en la piel", SymptomCategory.DERMATOLOGICO,
-                   "Comezón o irritación cutánea", 1.0,
-                   ["alergia", "sequedad"],
-                   {"ERUPCION", "ENROJECIMIENTO"}),
-        ]
-        
-        # Síntomas Cardiovasculares
-        cardiovascular_symptoms = [
-            Symptom("DOLOR_PECHO", "Dolor en el pecho", SymptomCategory.CARDIOVASCULAR,
-                   "Dolor o presión en área torácica", 2.8,
-                   ["esfuerzo", "estrés"],
-                   {"DIFICULTAD_RESPIRAR", "PALPITACIONES"}),
-            
-            Symptom("PALPITACIONES", "Palpitaciones", SymptomCategory.CARDIOVASCULAR,
-                   "Sensación de latidos cardíacos irregulares", 1.8,
-                   ["estrés", "cafeína"],
-                   {"MAREOS", "DOLOR_PECHO"}),
-        ]
+    # Índices derivados del catálogo base, calculados por la primera instancia
+    # y compartidos por las siguientes. register_symptom los reemplaza (nunca
+    # los muta), por lo que compartirlos entre instancias es seguro.
+    _SHARED: ClassVar[Optional[tuple]] = None
+    
+    def __init__(self, share: bool = True):
+        """
+        Inicializa el registro de síntomas
         
-        # Síntomas Urinarios
-        urinary_symptoms = [
-            Symptom("DOLOR_ORINAR", "Dolor al orinar", SymptomCategory.URINARIO,
-                   "Ardor o molestia durante la micción", 1.9,
-                   ["infección", "deshidratación"],
-                   {"FRECUENCIA_URINARIA", "ORINA_TURBIA"}),
-            
-            Symptom("FRECUENCIA_URINARIA", "Frecuencia urinaria aumentada", SymptomCategory.URINARIO,
-                   "Necesidad de orinar con mayor frecuencia", 1.3,
-                   ["infección", "diabetes"],
-                   {"DOLOR_ORINAR"}),
-        ]
+        Args:
+            share: Si es True, usa directamente las tablas del catálogo base y
+                   solo las copia al registrar su primer síntoma; si es False,
+                   las copia desde el inicio
+        """
+        # Tabla id -> síntoma; en código caliente indexarla directamente
+        # (registry.symptoms[id] o registry[id]) evita la llamada a get_symptom.
+        # Se expone como vista de solo lectura: solo register_symptom la modifica
+        self._symptoms: Dict[str, Symptom] = {}
+        self.symptoms: Mapping[str, Symptom] = MappingProxyType(self._symptoms)
+        # Síntomas relacionados ya resueltos a objetos (id -> síntomas)
+        self._related: Dict[str, Tuple[Symptom, ...]] = {}
+        # Secuencia densa en orden de registro + índice id -> posición
+        self._ordered: Sequence[Symptom] = []
+        self._index: Dict[str, int] = {}
+        # Pesos de severidad (float64) alineados con el índice denso
+        self._weights: Optional[np.ndarray] = None
+        # Bitmask (bit = índice denso) de los síntomas relacionados de cada síntoma
+        self._related_masks: Dict[str, int] = {}
+        # Grafo de síntomas relacionados en formato CSR (índices densos int32)
+        self._related_indptr: np.ndarray = np.zeros(1, dtype=np.int32)
+        self._related_indices: np.ndarray = np.zeros(0, dtype=np.int32)
+        # Índice invertido desencadenante -> síntomas
+        self._by_trigger: Dict[str, Tuple[Symptom, ...]] = {}
+        # Nombre y descripción en minúsculas + índice fragmento de palabra -> IDs
+        self._lowered: Dict[str, Tuple[str, str]] = {}
+        self._by_fragment: Dict[str, FrozenSet[str]] = {}
+        # Síntomas agrupados por categoría, en orden de registro
+        self._by_category: Dict[SymptomCategory, Tuple[Symptom, ...]] = {}
+        # Bitmask (bit = índice denso) de los síntomas de cada categoría
+        self._category_masks: Dict[SymptomCategory, int] = {}
+        # Tupla de todos los síntomas (se recalcula tras register_symptom)
+        self._all_symptoms: Optional[Tuple[Symptom, ...]] = None
+        # Conjunto inmutable de IDs (se recalcula tras register_symptom)
+        self._known_ids: Optional[FrozenSet[str]] = None
+        # Resultados de búsqueda por consulta en minúsculas (se vacía tras register_symptom)
+        self._search_cache: Dict[str, Tuple[Symptom, ...]] = {}
+        # False mientras symptoms/_ordered/_index sean las tablas compartidas
+        self._owns_tables = False
+        self._initialize_symptoms(share)
+    
+    def _initialize_symptoms(self, share: bool = True):
+        """Inicializa la base de datos completa de síntomas"""
+        # Reutilizar las tablas del catálogo ya precalculadas
+        # (register_symptom queda para altas dinámicas)
+        catalog, table, index, by_category, weights, view = _catalog_tables()
+        self._symptoms = table
+        self.symptoms = view
+        self._ordered = catalog
+        self._index = index
+        self._all_symptoms = catalog
+        self._weights = weights
+        if not share:
+            self._own_tables()
         
-        # Síntomas Oftalmológicos
-        ophthalmologic_symptoms = [
-            Symptom("VISION_BORROSA", "Visión borrosa", SymptomCategory.OFTALMOLOGICO,
-                   "Dificultad para ver con claridad", 1.6,
-                   ["fatiga", "migraña"],
-                   {"DOLOR_CABEZA", "MAREOS"}),
-            
-            Symptom("OJOS_ROJOS", "Ojos rojos", SymptomCategory.OFTALMOLOGICO,
-                   "Enrojecimiento ocular", 1.2,
-                   ["alergia", "irritación"],
-                   {"PICAZON_OJOS", "LAGRIMEO"}),
-        ]
+        shared = SymptomRegistry._SHARED
+        if shared is None:
+            # Validar y resolver referencias una sola vez por proceso
+            self._link_related_symptoms(validate=True)
+            self._index_triggers()
+            self._index_search()
+            self._by_category = by_category
+            self._index_category_masks()
+            SymptomRegistry._SHARED = (
+                self._related, self._related_masks, self._related_indptr,
+                self._related_indices, self._by_trigger, self._lowered,
+                self._by_fragment, self._by_category, self._category_masks,
+            )
+        else:
+            (self._related, self._related_masks, self._related_indptr,
+             self._related_indices, self._by_trigger, self._lowered,
+             self._by_fragment, self._by_category, self._category_masks) = shared
+    
+    def _link_related_symptoms(self, validate: bool = False):
+        """
+        Resuelve los síntomas relacionados a referencias directas.
+        Con validate=True falla si alguna referencia no existe en el registro
+        ni en los síntomas suplementarios.
+        """
+        related = {}
+        masks = {}
+        unknown = {}
+        indptr = [0]
+        neighbors: List[int] = []
+        for symptom in self._ordered:
+            resolved = []
+            positions = []
+            for related_id in symptom.related_symptoms:
+                target = self._symptoms.get(related_id)
+                if target is not None:
+                    resolved.append(target)
+                    positions.append(self._index[related_id])
+                elif related_id not in SUPPLEMENTARY_SYMPTOM_IDS:
+                    unknown.setdefault(symptom.id, []).append(related_id)
+            related[symptom.id] = tuple(resolved)
+            masks[symptom.id] = sum(1 << position for position in positions)
+            neighbors.extend(sorted(positions))
+            indptr.append(len(neighbors))
         
-        # Consolidar todos los síntomas
-        all_symptoms = (
-            respiratory_symptoms +
-            digestive_symptoms +
-            general_symptoms +
-            neurological_symptoms +
-            muscular_symptoms +
-            dermatological_symptoms +
-            cardiovascular_symptoms +
-            urinary_symptoms +
-            ophthalmologic_symptoms
-        )
+        if validate and unknown:
+            detail = "; ".join(
+                f"{symptom_id} -> {', '.join(sorted(ids))}"
+                for symptom_id, ids in sorted(unknown.items())
+            )
+            raise ValueError(f"Síntomas relacionados inexistentes: {detail}")
         
-        # Registrar síntomas
-        for symptom in all_symptoms:
-            self.register_symptom(symptom)
+        self._related = related
+        self._related_masks = masks
+        self._related_indptr = np.array(indptr, dtype=np.int32)
+        self._related_indices = np.array(neighbors, dtype=np.int32)
+        self._related_indptr.flags.writeable = False
+        self._related_indices.flags.writeable = False
+    
+    def _index_triggers(self):
+        """Construye el índice invertido de desencadenantes comunes"""
+        by_trigger: Dict[str, List[Symptom]] = {}
+        for symptom in self._ordered:
+            for trigger in symptom.common_triggers:
+                by_trigger.setdefault(trigger.lower(), []).append(symptom)
+        self._by_trigger = {t: tuple(s) for t, s in by_trigger.items()}
+    
+    def _index_search(self):
+        """
+        Construye el índice de búsqueda: textos en minúsculas y, para cada
+        fragmento de palabra, los síntomas cuyo nombre o descripción lo contienen.
+        """
+        lowered = {}
+        by_fragment: Dict[str, Set[str]] = {}
+        for symptom in self._ordered:
+            name = symptom.name.lower()
+            description = symptom.description.lower()
+            lowered[symptom.id] = (name, description)
+            for token in set(_WORD_RE.findall(f"{name} {description}")):
+                for start in range(len(token)):
+                    for end in range(start + 1, len(token) + 1):
+                        by_fragment.setdefault(token[start:end], set()).add(symptom.id)
+        self._lowered = lowered
+        self._by_fragment = {f: frozenset(ids) for f, ids in by_fragment.items()}
+    
+    def _index_categories(self):
+        """Agrupa los síntomas por categoría"""
+        by_category: Dict[SymptomCategory, List[Symptom]] = {}
+        for symptom in self._ordered:
+            by_category.setdefault(symptom.category, []).append(symptom)
+        self._by_category = {c: tuple(s) for c, s in by_category.items()}
+        self._index_category_masks()
+    
+    def _index_category_masks(self):
+        """Construye el bitmask de síntomas de cada categoría"""
+        index = self._index
+        self._category_masks = {
+            category: sum(1 << index[s.id] for s in symptoms)
+            for category, symptoms in self._by_category.items()
+        }
+    
+    def _own_tables(self):
+        """Copia las tablas compartidas antes de modificarlas (copia en escritura)"""
+        if not self._owns_tables:
+            self._symptoms = dict(self._symptoms)
+            self.symptoms = MappingProxyType(self._symptoms)
+            self._ordered = list(self._ordered)
+            self._index = dict(self._index)
+            self._owns_tables = True
     
     def register_symptom(self, symptom: Symptom):
         """Registra un nuevo síntoma"""
-        self.symptoms[symptom.id] = symptom
+        self._own_tables()
+        self._symptoms[symptom.id] = symptom
+        position = self._index.get(symptom.id)
+        if position is None:
+            self._index[symptom.id] = len(self._ordered)
+            self._ordered.append(symptom)
+        else:
+            self._ordered[position] = symptom
+        self._weights = None
+        self._all_symptoms = None
+        self._known_ids = None
+        self._search_cache = {}
+        if self._related:
+            # Registro posterior a la construcción: recalcular índices derivados
+            self._link_related_symptoms()
+            self._index_triggers()
+            self._index_search()
+            self._index_categories()
+    
+    def __getitem__(self, symptom_id: str) -> Symptom:
+        return self._ordered[self._index[symptom_id]]
+    
+    def __contains__(self, symptom_id: str) -> bool:
+        return symptom_id in self._index
+    
+    def __iter__(self):
+        return iter(self._ordered)
+    
+    def __len__(self) -> int:
+        return len(self._ordered)
+    
+    def get_symptom(self, symptom_id: str, default: Optional[Symptom] = None) -> Optional[Symptom]:
+        """
+        Obtiene un síntoma por su ID. Con un síntoma centinela como default
+        (por ejemplo con severity_weight=0.0) se evita comprobar None
+        """
+        return self._symptoms.get(symptom_id, default)
+    
+    def get_symptom_names(self, symptom_ids: Iterable[str]) -> List[str]:
+        """Obtiene los nombres de los síntomas registrados (ignora IDs desconocidos)"""
+        get = self._symptoms.get
+        return [symptom.name for symptom in map(get, symptom_ids) if symptom is not None]
+    
+    def get_symptom_index(self, symptom_id: str) -> Optional[int]:
+        """Obtiene el índice entero denso de un síntoma"""
+        return self._index.get(symptom_id)
+    
+    def get_symptom_indices(self, symptom_ids: Iterable[str]) -> np.ndarray:
+        """Convierte IDs de síntomas a índices densos (ignora IDs no registrados)"""
+        index = self._index
+        return np.fromiter(
+            (index[s] for s in symptom_ids if s in index), dtype=np.intp
+        )
+    
+    def get_weight_vector(self) -> np.ndarray:
+        """Vector float64 de pesos de severidad indexado por índice denso"""
+        if self._weights is None:
+            self._weights = np.fromiter(
+                (s.severity_weight for s in self._ordered),
+                dtype=np.float64, count=len(self._ordered)
+            )
+        return self._weights
+    
+    def score(self, active_ids: np.ndarray) -> float:
+        """Suma los pesos de severidad de los síntomas activos (índices densos)"""
+        return float(self.get_weight_vector()[active_ids].sum())
+    
+    def score_many(self, patients: Sequence["PatientSymptoms"]) -> np.ndarray:
+        """
+        Calcula el puntaje de severidad de varios pacientes en una sola pasada.
+        Equivale a calculate_severity_score para cada paciente.
+        """
+        index = self._index
+        rows, columns, severities = [], [], []
+        for row, patient in enumerate(patients):
+            for symptom_id, entry in patient.entries.items():
+                position = index.get(symptom_id)
+                if position is not None:
+                    rows.append(row)
+                    columns.append(position)
+                    severities.append(entry.severity)
+        
+        rows = np.asarray(rows, dtype=np.intp)
+        columns = np.asarray(columns, dtype=np.intp)
+        severities = np.asarray(severities, dtype=np.float64)
+        if _jit_accumulate_scores is not None:
+            # Ruta compilada: gather, producto y suma sin arreglos temporales
+            return _jit_accumulate_scores(rows, columns, severities,
+                                          self.get_weight_vector(), len(patients))
+        
+        contributions = self.get_weight_vector()[columns] * severities
+        scores = np.bincount(rows, weights=contributions, minlength=len(patients))
+        return scores.astype(np.float64, copy=False)
+    
+    def get_symptom_mask(self, symptom_ids: Iterable[str]) -> int:
+        """Convierte IDs de síntomas a un bitmask (ignora IDs no registrados)"""
+        index = self._index
+        mask = 0
+        for symptom_id in symptom_ids:
+            position = index.get(symptom_id)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+    
+    def get_category_mask(self, category: SymptomCategory) -> int:
+        """Obtiene el bitmask de los síntomas de una categoría"""
+        return self._category_masks.get(category, 0)
+    
+    def get_related_mask(self, symptom_id: str) -> int:
+        """Obtiene el bitmask de síntomas relacionados de un síntoma"""
+        return self._related_masks.get(symptom_id, 0)
+    
+    def count_related_present(self, symptom_id: str, symptom_ids: Iterable[str]) -> int:
+        """Cuenta cuántos síntomas relacionados de un síntoma están presentes"""
+        return (self.get_related_mask(symptom_id) & self.get_symptom_mask(symptom_ids)).bit_count()
+    
+    def neighbors(self, symptom_index: int) -> np.ndarray:
+        """Índices densos (int32) de los síntomas relacionados con el de ese índice"""
+        indptr = self._related_indptr
+        return self._related_indices[indptr[symptom_index]:indptr[symptom_index + 1]]
     
-    def get_symptom(self, symptom_id: str) -> Optional[Symptom]:
-        """Obtiene un síntoma por su ID"""
-        return self.symptoms.get(symptom_id)
+    def get_related_graph(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Grafo de síntomas relacionados en formato CSR (indptr, indices)"""
+        return self._related_indptr, self._related_indices
     
-    def get_symptoms_by_category(self, category: SymptomCategory) -> List[Symptom]:
+    def get_related_symptoms(self, symptom_id: str) -> List[Symptom]:
+        """Obtiene los síntomas relacionados registrados de un síntoma"""
+        return list(self._related.get(symptom_id, ()))
+    
+    def get_symptoms_by_trigger(self, trigger: str) -> List[Symptom]:
+        """Obtiene los síntomas asociados a un desencadenante común"""
+        return list(self._by_trigger.get(trigger.lower(), ()))
+    
+    def get_symptoms_by_category(self, category: SymptomCategory) -> Tuple[Symptom, ...]:
         """Obtiene todos los síntomas de una categoría"""
-        return [s for s in self.symptoms.values() if s.category == category]
+        return self._by_category.get(category, ())
+    
+    @property
+    def known_ids(self) -> FrozenSet[str]:
+        """IDs de todos los síntomas registrados, para pruebas de pertenencia en lote"""
+        if self._known_ids is None:
+            self._known_ids = frozenset(self._index)
+        return self._known_ids
     
-    def get_all_symptoms(self) -> List[Symptom]:
+    def get_all_symptoms(self) -> Tuple[Symptom, ...]:
         """Obtiene todos los síntomas registrados"""
-        return list(self.symptoms.values())
+        if self._all_symptoms is None:
+            self._all_symptoms = tuple(self._ordered)
+        return self._all_symptoms
     
     def search_symptoms(self, query: str) -> List[Symptom]:
         """Busca síntomas por nombre o descripción"""
-        query = query.lower()
-        return [
-            s for s in self.symptoms.values()
-            if query in s.name.lower() or query in s.description.lower()
-        ]
+        if not query:
+            # La cadena vacía está contenida en cualquier texto
+            return list(self.get_all_symptoms())
+        # Internar la consulta: búsquedas repetidas reutilizan la misma cadena
+        query = sys.intern(query.lower())
+        cache = self._search_cache
+        results = cache.get(query)
+        if results is None:
+            results = self._search(query)
+            if len(cache) >= _SEARCH_CACHE_SIZE:
+                cache.clear()
+            cache[query] = results
+        # Lista nueva: quien llama puede modificarla sin alterar la caché
+        return list(results)
+    
+    def _search(self, query: str) -> Tuple[Symptom, ...]:
+        """Busca una consulta ya normalizada usando el índice de fragmentos"""
+        # Cada palabra de la consulta debe ser fragmento de alguna palabra del
+        # texto: intersectar sus listas reduce los candidatos a verificar
+        words = _WORD_RE.findall(query)
+        candidates = None
+        for word in words:
+            ids = self._by_fragment.get(word)
+            if ids is None:
+                return ()
+            candidates = ids if candidates is None else candidates & ids
+        
+        if candidates is None:
+            shortlist = self._ordered
+        else:
+            index = self._index
+            shortlist = tuple(self._ordered[i] for i in sorted(index[c] for c in candidates))
+            if len(words) == 1 and words[0] == query:
+                # Consulta de una sola palabra: el índice ya es exacto
+                return shortlist
+        lowered = self._lowered
+        return tuple(
+            s for s in shortlist
+            if query in lowered[s.id][0] or query in lowered[s.id][1]
+        )
+
+
+@functools.cache
+def get_default_registry() -> SymptomRegistry:
+    """
+    Obtiene el registro de síntomas compartido por todo el proceso.
+    Se construye una sola vez y debe tratarse como de solo lectura;
+    para registrar síntomas propios crear un SymptomRegistry() independiente.
+    """
+    return SymptomRegistry()
+
+
+@dataclass(slots=True)
+class _SymptomEntry:
+    """Datos reportados por el paciente para un síntoma"""
+    severity: SeverityLevel
+    duration: int
+    note: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class PatientSymptoms:
     """Representa los síntomas reportados por un paciente"""
-    symptoms: Set[str] = field(default_factory=set)
-    severity_levels: Dict[str, SeverityLevel] = field(default_factory=dict)
-    duration_days: Dict[str, int] = field(default_factory=dict)
-    notes: Dict[str, str] = field(default_factory=dict)
+    # Un único registro por síntoma (severidad, duración y nota)
+    entries: Dict[str, _SymptomEntry] = field(default_factory=dict)
+    # Último score calculado y vector de pesos con el que se calculó; se
+    # invalida en cada modificación hecha con los métodos de esta clase
+    _score_cache: Optional[Tuple[np.ndarray, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def symptoms(self) -> KeysView[str]:
+        """IDs de los síntomas reportados (vista de solo lectura)"""
+        return self.entries.keys()
+    
+    @property
+    def severity_levels(self) -> Dict[str, SeverityLevel]:
+        """Severidad de cada síntoma"""
+        return {symptom_id: e.severity for symptom_id, e in self.entries.items()}
+    
+    @property
+    def duration_days(self) -> Dict[str, int]:
+        """Duración en días de cada síntoma"""
+        return {symptom_id: e.duration for symptom_id, e in self.entries.items()}
+    
+    @property
+    def notes(self) -> Dict[str, str]:
+        """Notas de los síntomas que tienen alguna"""
+        return {symptom_id: e.note for symptom_id, e in self.entries.items() if e.note}
     
     def add_symptom(self, symptom_id: str, severity: SeverityLevel = SeverityLevel.MODERADO,
                    duration: int = 1, note: str = ""):
         """Agrega un síntoma al reporte del paciente"""
-        self.symptoms.add(symptom_id)
-        self.severity_levels[symptom_id] = severity
-        self.duration_days[symptom_id] = duration
-        if note:
-            self.notes[symptom_id] = note
+        symptom_id = sys.intern(symptom_id)
+        if not note:
+            # Conservar la nota previa si se actualiza el síntoma sin nota nueva
+            previous = self.entries.get(symptom_id)
+            note = previous.note if previous else ""
+        self.entries[symptom_id] = _SymptomEntry(severity, duration, note)
+        self._score_cache = None
+    
+    def add_symptoms(self, symptoms: Iterable[Tuple]):
+        """
+        Agrega varios síntomas de una vez. Cada elemento es una tupla
+        (síntoma, severidad, duración) o (síntoma, severidad, duración, nota),
+        con la misma semántica que add_symptom
+        """
+        entries = self.entries
+        intern = sys.intern
+        for symptom_id, severity, duration, *note in symptoms:
+            symptom_id = intern(symptom_id)
+            note = note[0] if note and note[0] else ""
+            if not note:
+                previous = entries.get(symptom_id)
+                note = previous.note if previous else ""
+            entries[symptom_id] = _SymptomEntry(severity, duration, note)
+        self._score_cache = None
+    
+    def __copy__(self) -> "PatientSymptoms":
+        """
+        Copia independiente del reporte. Basta con copiar el diccionario:
+        los registros se reemplazan al modificarse, nunca se mutan en sitio
+        """
+        clone = PatientSymptoms(dict(self.entries))
+        clone._score_cache = self._score_cache
+        return clone
     
     def remove_symptom(self, symptom_id: str):
         """Elimina un síntoma del reporte"""
-        self.symptoms.discard(symptom_id)
-        self.severity_levels.pop(symptom_id, None)
-        self.duration_days.pop(symptom_id, None)
-        self.notes.pop(symptom_id, None)
+        if self.entries.pop(symptom_id, None) is not None:
+            self._score_cache = None
     
     def get_severity(self, symptom_id: str) -> Optional[SeverityLevel]:
         """Obtiene el nivel de severidad de un síntoma"""
-        return self.severity_levels.get(symptom_id)
+        entry = self.entries.get(symptom_id)
+        return entry.severity if entry else None
     
     def get_duration(self, symptom_id: str) -> int:
         """Obtiene la duración en días de un síntoma"""
-        return self.duration_days.get(symptom_id, 0)
+        entry = self.entries.get(symptom_id)
+        return entry.duration if entry else 0
+    
+    def get_note(self, symptom_id: str, default: str = "") -> str:
+        """Obtiene la nota de un síntoma"""
+        entry = self.entries.get(symptom_id)
+        return entry.note if entry and entry.note else default
     
     def has_symptom(self, symptom_id: str) -> bool:
         """Verifica si el paciente tiene un síntoma específico"""
-        return symptom_id in self.symptoms
+        return symptom_id in self.entries
     
     def get_symptom_count(self) -> int:
         """Obtiene el número total de síntomas"""
-        return len(self.symptoms)
+        return len(self.entries)
+    
+    def get_signature(self) -> FrozenSet[Tuple[str, int, int]]:
+        """Firma inmutable (síntoma, severidad, duración) del estado del paciente"""
+        return frozenset((symptom_id, e.severity, e.duration) for symptom_id, e in self.entries.items())
+    
+    def get_symptom_mask(self, registry: SymptomRegistry) -> int:
+        """
+        Bitmask de los síntomas del paciente según los índices densos del
+        registro (ignora IDs no registrados). Permite intersecciones y conteos
+        con las máscaras del registro mediante operaciones enteras.
+        """
+        return registry.get_symptom_mask(self.entries)
+    
+    def count_in_category(self, registry: SymptomRegistry, category: SymptomCategory) -> int:
+        """Cuenta los síntomas del paciente que pertenecen a una categoría"""
+        return (self.get_symptom_mask(registry) & registry.get_category_mask(category)).bit_count()
     
     def calculate_severity_score(self, registry: SymptomRegistry) -> float:
         """Calcula un puntaje de severidad total basado en los síntomas"""
-        total_score = 0.0
-        for symptom_id in self.symptoms:
-            symptom = registry.get_symptom(symptom_id)
-            if symptom:
-                severity = self.severity_levels.get(symptom_id, SeverityLevel.MODERADO)
-                total_score += symptom.severity_weight * severity.value
-        return total_score
+        if not self.entries:
+            return 0.0
+        # El vector de pesos identifica el estado del registro: se comparte
+        # solo entre registros con el mismo índice y cambia al registrar síntomas
+        weights = registry.get_weight_vector()
+        cache = self._score_cache
+        if cache is not None and cache[0] is weights:
+            return cache[1]
+        # Misma ruta vectorizada (NumPy o Numba) que el cálculo por lotes
+        score = float(registry.score_many((self,))[0])
+        self._score_cache = (weights, score)
+        return score
     
     def clear(self):
         """Limpia todos los síntomas"""
-        self.symptoms.clear()
-        self.severity_levels.clear()
-        self.duration_days.clear()
-        self.notes.clear()
\ No newline at end of file
+        self.entries.clear()
+        self._score_cache = None
@@ -6,14 +6,17 @@ Inicialización y configuración común
 import sys
 import os
 
-# Agregar el directorio src al path de Python
-src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
-if src_path not in sys.path:
-    sys.path.insert(0, src_path)
+TESTS_DIR = os.path.dirname(__file__)
+
+# Agregar el directorio src al path de Python (calculado una sola vez)
+SRC_PATH = os.path.abspath(os.path.join(TESTS_DIR, '..', 'src'))
+src_path = SRC_PATH
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
 
 # Configuración global de pruebas
-TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
-TEST_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
+TEST_DATA_DIR = os.path.join(TESTS_DIR, '..', 'data')
+TEST_OUTPUT_DIR = os.path.join(TESTS_DIR, 'output')
 
 # Crear directorio de salida si no existe
 os.makedirs(TEST_OUTPUT_DIR, exist_ok=True)
@@ -0,0 +1,30 @@
+"""
+Objetos compartidos por los módulos de prueba
+Se construyen una sola vez por proceso y deben tratarse como de solo lectura;
+las pruebas que registran datos propios crean sus propias instancias
+"""
+
+import functools
+
+from symptoms import SymptomRegistry, get_default_registry
+from knowledge_base import KnowledgeBase
+from cases import CaseGenerator
+
+
+@functools.cache
+def kb() -> KnowledgeBase:
+    """Base de conocimiento compartida, con los índices de reglas ya construidos"""
+    knowledge_base = KnowledgeBase()
+    knowledge_base.get_rule_matrix()
+    return knowledge_base
+
+
+def registry() -> SymptomRegistry:
+    """Registro de síntomas compartido por todo el proceso"""
+    return get_default_registry()
+
+
+@functools.cache
+def cases() -> CaseGenerator:
+    """Generador de casos clínicos compartido"""
+    return CaseGenerator()
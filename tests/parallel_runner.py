@@ -0,0 +1,107 @@
+"""
+Ejecución en paralelo de las suites de pruebas
+Reparte las clases TestCase entre procesos (una clase por tarea)
+"""
+
+import io
+import os
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+# Variable de entorno que indica a las pruebas que comparten CPU con otros
+# procesos (las mediciones de tiempo dejan de ser fiables)
+PARALLEL_ENV = "TESTS_PARALLEL"
+
+
+def running_in_parallel():
+    """Indica si las pruebas se ejecutan en varios procesos (runner o xdist)"""
+    return bool(os.environ.get(PARALLEL_ENV) or os.environ.get("PYTEST_XDIST_WORKER"))
+
+
+def default_workers():
+    """Número de procesos: todos los núcleos menos dos, mínimo uno"""
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+def default_verbosity():
+    """Detalle del runner: una línea por prueba solo con VERBOSE=1 o en CI"""
+    return 2 if os.environ.get("VERBOSE") or os.environ.get("CI") else 1
+
+
+def _quiet():
+    """Con QUIET=1 se descarta la salida del runner (el resultado se conserva)"""
+    return bool(os.environ.get("QUIET"))
+
+
+def module_test_classes(module):
+    """
+    Clases TestCase definidas en un módulo, en orden de definición. Las
+    clases nuevas se incluyen sin tener que registrarlas en el runner
+    """
+    return tuple(
+        value for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, unittest.TestCase)
+        and value.__module__ == module.__name__
+    )
+
+
+def _run_test_class(test_class, verbosity):
+    """Ejecuta una clase de prueba y devuelve un resumen serializable"""
+    stream = io.StringIO()
+    suite = unittest.TestLoader().loadTestsFromTestCase(test_class)
+    # buffer=True: la salida de las pruebas que pasan no se imprime
+    runner = unittest.TextTestRunner(stream=stream, verbosity=verbosity, buffer=True)
+    result = runner.run(suite)
+    return (
+        stream.getvalue(),
+        result.testsRun,
+        [(str(test), traceback) for test, traceback in result.failures],
+        [(str(test), traceback) for test, traceback in result.errors],
+        [(str(test), reason) for test, reason in result.skipped],
+    )
+
+
+def run_test_classes(test_classes, verbosity=None, workers=None):
+    """
+    Ejecuta las clases de prueba repartidas entre procesos y combina sus
+    resultados en un solo unittest.TestResult. Con un solo proceso
+    disponible se ejecutan en serie, como un TextTestRunner normal
+    """
+    if verbosity is None:
+        verbosity = default_verbosity()
+    if workers is None:
+        workers = default_workers()
+    workers = min(workers, len(test_classes))
+    
+    if workers <= 1:
+        loader = unittest.TestLoader()
+        suite = unittest.TestSuite(
+            loader.loadTestsFromTestCase(test_class) for test_class in test_classes
+        )
+        stream = io.StringIO() if _quiet() else sys.stderr
+        return unittest.TextTestRunner(stream=stream, verbosity=verbosity, buffer=True).run(suite)
+    
+    previous = os.environ.get(PARALLEL_ENV)
+    os.environ[PARALLEL_ENV] = "1"
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shards = list(executor.map(
+                _run_test_class, test_classes, [verbosity] * len(test_classes)
+            ))
+    finally:
+        if previous is None:
+            del os.environ[PARALLEL_ENV]
+        else:
+            os.environ[PARALLEL_ENV] = previous
+    
+    # Combinar en el orden original de las clases
+    result = unittest.TestResult()
+    for output, tests_run, failures, errors, skipped in shards:
+        if not _quiet():
+            print(output, end="")
+        result.testsRun += tests_run
+        result.failures.extend(failures)
+        result.errors.extend(errors)
+        result.skipped.extend(skipped)
+    return result
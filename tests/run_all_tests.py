@@ -9,29 +9,41 @@ import unittest
 import time
 from datetime import datetime
 
-# Agregar src al path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+try:
+    # Importar el paquete de pruebas ya agrega src al path
+    from tests import SRC_PATH
+except ImportError:
+    # Ejecutado como script: el paquete tests no es importable
+    SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+    if SRC_PATH not in sys.path:
+        sys.path.insert(0, SRC_PATH)
 
-# Importar módulos de prueba
-from test_symptoms import run_tests as run_symptoms_tests
-from test_knowledge_base import run_tests as run_kb_tests
-from test_inference_engine import run_tests as run_inference_tests
-from test_integration import run_all_integration_tests
+# Los módulos de prueba se importan dentro de cada sección: un error al
+# importar uno no impide ejecutar los demás
+
+
+# Bordes de banners y secciones, construidos una sola vez
+BANNER_WIDTH = 70
+_BORDER = "=" * BANNER_WIDTH
+_DASH = "-" * BANNER_WIDTH
+
+# Nombres de cada módulo en el reporte final
+DISPLAY_NAMES = {
+    'symptoms': 'Symptoms',
+    'knowledge_base': 'Knowledge Base',
+    'inference_engine': 'Inference Engine',
+    'integration': 'Integration',
+}
 
 
 def print_banner(text):
     """Imprime un banner decorativo"""
-    width = 70
-    print("\n" + "="*width)
-    print(text.center(width))
-    print("="*width + "\n")
+    sys.stdout.write(f"\n{_BORDER}\n{text.center(BANNER_WIDTH)}\n{_BORDER}\n\n")
 
 
 def print_section(text):
     """Imprime un encabezado de sección"""
-    print("\n" + "-"*70)
-    print(f"  {text}")
-    print("-"*70)
+    sys.stdout.write(f"\n{_DASH}\n  {text}\n{_DASH}\n")
 
 
 def run_all_tests():
@@ -51,6 +63,7 @@ def run_all_tests():
     print_section("1️⃣  MÓDULO DE SÍNTOMAS")
     start = time.time()
     try:
+        from test_symptoms import run_tests as run_symptoms_tests
         result = run_symptoms_tests()
         all_results['symptoms'] = result
         elapsed = time.time() - start
@@ -64,6 +77,7 @@ def run_all_tests():
     print_section("2️⃣  BASE DE CONOCIMIENTO")
     start = time.time()
     try:
+        from test_knowledge_base import run_tests as run_kb_tests
         result = run_kb_tests()
         all_results['knowledge_base'] = result
         elapsed = time.time() - start
@@ -77,6 +91,7 @@ def run_all_tests():
     print_section("3️⃣  MOTOR DE INFERENCIA")
     start = time.time()
     try:
+        from test_inference_engine import run_tests as run_inference_tests
         result = run_inference_tests()
         all_results['inference_engine'] = result
         elapsed = time.time() - start
@@ -90,6 +105,7 @@ def run_all_tests():
     print_section("4️⃣  INTEGRACIÓN DEL SISTEMA")
     start = time.time()
     try:
+        from test_integration import run_all_integration_tests
         result = run_all_integration_tests()
         all_results['integration'] = result
         elapsed = time.time() - start
@@ -112,79 +128,60 @@ def generate_final_report(results, total_time):
     
     print_banner("📊 REPORTE FINAL DE PRUEBAS")
     
-    # Calcular totales
+    # Una sola pasada: totales, filas de la tabla y estadísticas por módulo
     total_tests = 0
     total_failures = 0
     total_errors = 0
     total_skipped = 0
     
-    module_results = []
+    table_rows = []
+    stats_lines = []
     
     for module_name, result in results.items():
-        if result:
-            tests_run = result.testsRun
-            failures = len(result.failures)
-            errors = len(result.errors)
-            skipped = len(getattr(result, 'skipped', []))
-            passed = tests_run - failures - errors - skipped
-            
-            total_tests += tests_run
-            total_failures += failures
-            total_errors += errors
-            total_skipped += skipped
-            
-            # Calcular porcentaje de éxito
-            success_rate = (passed / tests_run * 100) if tests_run > 0 else 0
-            
-            status = "✅ PASS" if result.wasSuccessful() else "❌ FAIL"
-            
-            module_results.append({
-                'name': module_name.replace('_', ' ').title(),
-                'status': status,
-                'tests': tests_run,
-                'passed': passed,
-                'failures': failures,
-                'errors': errors,
-                'success_rate': success_rate
-            })
-        else:
-            module_results.append({
-                'name': module_name.replace('_', ' ').title(),
-                'status': "⚠️  ERROR",
-                'tests': 0,
-                'passed': 0,
-                'failures': 0,
-                'errors': 0,
-                'success_rate': 0
-            })
+        name = DISPLAY_NAMES.get(module_name) or module_name.replace('_', ' ').title()
+        if not result:
+            table_rows.append(f"│ {name[:40]:<40} │ {'⚠️  ERROR':<10} │ {0:7.1f}% │")
+            continue
+        
+        tests_run = result.testsRun
+        failures = len(result.failures)
+        errors = len(result.errors)
+        skipped = len(getattr(result, 'skipped', ()))
+        passed = tests_run - failures - errors - skipped
+        
+        total_tests += tests_run
+        total_failures += failures
+        total_errors += errors
+        total_skipped += skipped
+        
+        # Calcular porcentaje de éxito
+        success_rate = (passed / tests_run * 100) if tests_run > 0 else 0
+        
+        status = "✅ PASS" if result.wasSuccessful() else "❌ FAIL"
+        table_rows.append(f"│ {name[:40]:<40} │ {status:<10} │ {success_rate:7.1f}% │")
+        
+        if tests_run > 0:
+            stats_lines.append(f"\n{name}:")
+            stats_lines.append(f"  • Total de pruebas: {tests_run}")
+            stats_lines.append(f"  • Exitosas: {passed} ({success_rate:.1f}%)")
+            if failures > 0:
+                stats_lines.append(f"  • Fallidas: {failures}")
+            if errors > 0:
+                stats_lines.append(f"  • Errores: {errors}")
     
     # Imprimir tabla de resultados
     print("┌" + "─"*68 + "┐")
-    print("│ {:40} │ {:10} │ {:8} │".format("MÓDULO", "ESTADO", "ÉXITO"))
+    print(f"│ {'MÓDULO':<40} │ {'ESTADO':<10} │ {'ÉXITO':<8} │")
     print("├" + "─"*68 + "┤")
-    
-    for mr in module_results:
-        print("│ {:40} │ {:10} │ {:7.1f}% │".format(
-            mr['name'][:40],
-            mr['status'],
-            mr['success_rate']
-        ))
-    
+    if table_rows:
+        print("\n".join(table_rows))
     print("└" + "─"*68 + "┘")
     
     # Estadísticas detalladas
     print("\n📈 ESTADÍSTICAS DETALLADAS")
     print(f"━" * 70)
-    
-    for mr in module_results:
-        if mr['tests'] > 0:
-            print(f"\n{mr['name']}:")
-            print(f"  • Total de pruebas: {mr['tests']}")
-            print(f"  • Exitosas: {mr['passed']} ({mr['success_rate']:.1f}%)")
-            if mr['failures'] > 0:
-                print(f"  • Fallidas: {mr['failures']}")
-            if mr['errors'] > 0:
-                print(f"  • Errores: {mr['errors']}")
+    if stats_lines:
+        print("\n".join(stats_lines))
     
     # Resumen global
     print(f"\n{'─'*70}")
@@ -242,37 +239,42 @@ def generate_detailed_report_file(results, total_time):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"test_report_{timestamp}.txt"
     
+    # Acumular el reporte y escribirlo de una sola vez
+    parts = [
+        _BORDER + "\n",
+        "REPORTE DETALLADO DE PRUEBAS\n",
+        f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        _BORDER + "\n\n",
+    ]
+    
+    for module_name, result in results.items():
+        if result:
+            parts.append(f"\n{'─'*70}\n")
+            parts.append(f"MÓDULO: {module_name.upper()}\n")
+            parts.append(f"{'─'*70}\n\n")
+            
+            parts.append(f"Pruebas ejecutadas: {result.testsRun}\n")
+            parts.append(f"Fallidas: {len(result.failures)}\n")
+            parts.append(f"Errores: {len(result.errors)}\n\n")
+            
+            if result.failures:
+                parts.append("PRUEBAS FALLIDAS:\n")
+                for test, traceback in result.failures:
+                    parts.append(f"\n  • {test}\n")
+                    parts.append(f"    {traceback}\n")
+            
+            if result.errors:
+                parts.append("\nERRORES:\n")
+                for test, traceback in result.errors:
+                    parts.append(f"\n  • {test}\n")
+                    parts.append(f"    {traceback}\n")
+    
+    parts.append(f"\n{_BORDER}\n")
+    parts.append(f"Tiempo total: {total_time:.2f}s\n")
+    parts.append(f"{_BORDER}\n")
+    
     with open(filename, 'w', encoding='utf-8') as f:
-        f.write("="*70 + "\n")
-        f.write("REPORTE DETALLADO DE PRUEBAS\n")
-        f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("="*70 + "\n\n")
-        
-        for module_name, result in results.items():
-            if result:
-                f.write(f"\n{'─'*70}\n")
-                f.write(f"MÓDULO: {module_name.upper()}\n")
-                f.write(f"{'─'*70}\n\n")
-                
-                f.write(f"Pruebas ejecutadas: {result.testsRun}\n")
-                f.write(f"Fallidas: {len(result.failures)}\n")
-                f.write(f"Errores: {len(result.errors)}\n\n")
-                
-                if result.failures:
-                    f.write("PRUEBAS FALLIDAS:\n")
-                    for test, traceback in result.failures:
-                        f.write(f"\n  • {test}\n")
-                        f.write(f"    {traceback}\n")
-                
-                if result.errors:
-                    f.write("\nERRORES:\n")
-                    for test, traceback in result.errors:
-                        f.write(f"\n  • {test}\n")
-                        f.write(f"    {traceback}\n")
-        
-        f.write(f"\n{'='*70}\n")
-        f.write(f"Tiempo total: {total_time:.2f}s\n")
-        f.write(f"{'='*70}\n")
+        f.write("".join(parts))
     
     print(f"\n📄 Reporte detallado guardado en: {filename}")
 
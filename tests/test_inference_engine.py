@@ -2,25 +2,62 @@
 Pruebas Unitarias para el Motor de Inferencia
 """
 
+import copy
 import unittest
 import sys
 import os
 
+import numpy as np
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from symptoms import SymptomRegistry, PatientSymptoms, SeverityLevel
-from knowledge_base import KnowledgeBase
+import inference_engine
+import numba_kernels
+from symptoms import PatientSymptoms, SeverityLevel
 from inference_engine import InferenceEngine, DiagnosisResult
+from knowledge_base import KnowledgeBase, Disease
+
+try:
+    from tests import _fixtures as fixtures
+    from tests.parallel_runner import module_test_classes, run_test_classes
+except ImportError:
+    # Ejecutado como script desde tests/
+    import _fixtures as fixtures
+    from parallel_runner import module_test_classes, run_test_classes
+
+
+def _template_patient(*symptoms) -> PatientSymptoms:
+    """Construye un paciente plantilla a partir de (síntoma, severidad, duración)"""
+    patient = PatientSymptoms()
+    patient.add_symptoms(symptoms)
+    return patient
+
+
+# Pacientes plantilla: las pruebas usan copy.copy si necesitan modificarlos
+GRIPE_PATIENT = _template_patient(
+    ("FIEBRE", SeverityLevel.GRAVE, 3),
+    ("FATIGA", SeverityLevel.GRAVE, 3),
+    ("DOLOR_MUSCULAR", SeverityLevel.GRAVE, 3),
+    ("DOLOR_CABEZA", SeverityLevel.MODERADO, 3),
+    ("TOS_SECA", SeverityLevel.MODERADO, 2),
+)
+GASTRITIS_PATIENT = _template_patient(
+    ("DOLOR_ABDOMINAL", SeverityLevel.GRAVE, 2),
+    ("ACIDEZ", SeverityLevel.GRAVE, 2),
+    ("NAUSEAS", SeverityLevel.MODERADO, 2),
+    ("PERDIDA_APETITO", SeverityLevel.MODERADO, 2),
+)
 
 
 class TestInferenceEngine(unittest.TestCase):
     """Pruebas para la clase InferenceEngine"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_engine_initialization(self):
         """Verifica la inicialización del motor"""
@@ -39,14 +76,7 @@ class TestInferenceEngine(unittest.TestCase):
     
     def test_diagnose_with_gripe_symptoms(self):
         """Verifica el diagnóstico de gripe"""
-        patient = PatientSymptoms()
-        patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3)
-        patient.add_symptom("FATIGA", SeverityLevel.GRAVE, 3)
-        patient.add_symptom("DOLOR_MUSCULAR", SeverityLevel.GRAVE, 3)
-        patient.add_symptom("DOLOR_CABEZA", SeverityLevel.MODERADO, 3)
-        patient.add_symptom("TOS_SECA", SeverityLevel.MODERADO, 2)
-        
-        results = self.engine.diagnose(patient, max_results=5)
+        results = self.engine.diagnose(GRIPE_PATIENT, max_results=5)
         
         self.assertGreater(len(results), 0)
         
@@ -57,13 +87,7 @@ class TestInferenceEngine(unittest.TestCase):
     
     def test_diagnose_with_gastritis_symptoms(self):
         """Verifica el diagnóstico de gastritis"""
-        patient = PatientSymptoms()
-        patient.add_symptom("DOLOR_ABDOMINAL", SeverityLevel.GRAVE, 2)
-        patient.add_symptom("ACIDEZ", SeverityLevel.GRAVE, 2)
-        patient.add_symptom("NAUSEAS", SeverityLevel.MODERADO, 2)
-        patient.add_symptom("PERDIDA_APETITO", SeverityLevel.MODERADO, 2)
-        
-        results = self.engine.diagnose(patient, max_results=5)
+        results = self.engine.diagnose(GASTRITIS_PATIENT, max_results=5)
         
         self.assertGreater(len(results), 0)
         top_result = results[0]
@@ -95,15 +119,124 @@ class TestInferenceEngine(unittest.TestCase):
         results = self.engine.diagnose(patient, max_results=max_results)
         
         self.assertLessEqual(len(results), max_results)
+    
+    def test_vectorized_scores_match_per_disease_evaluation(self):
+        """Verifica que la puntuación matricial coincida con la evaluación individual"""
+        patient = PatientSymptoms()
+        patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3)
+        patient.add_symptom("TOS_SECA", SeverityLevel.MODERADO, 10)
+        patient.add_symptom("DIARREA", SeverityLevel.LEVE, 0)
+        patient.add_symptom("LAGRIMEO", SeverityLevel.LEVE, 1)
+        
+        matrix = self.kb.get_rule_matrix()
+        scores = self.engine._score_diseases(patient, matrix)
+        for disease_id, score in zip(matrix.disease_ids, scores):
+            expected = self.engine._evaluate_disease(self.kb.get_disease(disease_id), patient)
+            self.assertEqual(score, expected.confidence, disease_id)
+    
+    @unittest.skipUnless(numba_kernels.NUMBA_AVAILABLE, "numba no está instalado")
+    def test_jit_scores_match_numpy(self):
+        """Verifica que el núcleo compilado coincida con la ruta NumPy"""
+        patient = PatientSymptoms()
+        patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3)
+        patient.add_symptom("FATIGA", SeverityLevel.MODERADO, 9)
+        patient.add_symptom("DIARREA", SeverityLevel.LEVE, 0)
+        
+        matrix = self.kb.get_rule_matrix()
+        jit_scores = self.engine._score_diseases(patient, matrix)
+        kernel = inference_engine._jit_score_diseases
+        inference_engine._jit_score_diseases = None
+        try:
+            numpy_scores = self.engine._score_diseases(patient, matrix)
+        finally:
+            inference_engine._jit_score_diseases = kernel
+        np.testing.assert_array_equal(jit_scores, numpy_scores)
+    
+    def test_diagnose_builds_only_requested_results(self):
+        """Verifica que solo se construyan los resultados solicitados"""
+        patient = PatientSymptoms()
+        patient.add_symptom("FIEBRE", SeverityLevel.MODERADO, 2)
+        patient.add_symptom("DOLOR_CABEZA", SeverityLevel.LEVE, 1)
+        
+        top = self.engine.diagnose(patient, max_results=1)
+        ranking = self.engine._diagnosis_cache[patient.get_signature()]
+        self.assertEqual(len(ranking.results), len(top))
+        
+        results = self.engine.diagnose(patient, max_results=10)
+        self.assertEqual(len(ranking.results), len(results))
+        self.assertEqual(results[0].disease.id, top[0].disease.id)
+    
+    def test_diagnose_memoized_by_signature(self):
+        """Verifica que los diagnósticos repetidos reutilicen la evaluación"""
+        patient = PatientSymptoms()
+        patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3)
+        patient.add_symptom("FATIGA", SeverityLevel.GRAVE, 3)
+        
+        first = self.engine.diagnose(patient, max_results=5)
+        first[0].confidence = -1.0
+        second = self.engine.diagnose(patient, max_results=2)
+        self.assertIn(patient.get_signature(), self.engine._diagnosis_cache)
+        self.assertEqual([r.disease.id for r in second], [r.disease.id for r in first[:2]])
+        self.assertGreater(second[0].confidence, 0)
+        
+        # Un cambio en el paciente produce una nueva firma
+        patient.add_symptom("FIEBRE", SeverityLevel.LEVE, 3)
+        self.assertNotIn(patient.get_signature(), self.engine._diagnosis_cache)
+        
+        self.engine.cache_clear()
+        self.assertEqual(len(self.engine._diagnosis_cache), 0)
+    
+    def test_diagnose_sees_registered_disease(self):
+        """Verifica que registrar una enfermedad invalide los diagnósticos memorizados"""
+        # Base y motor propios: los compartidos por la clase no deben modificarse
+        engine = InferenceEngine(KnowledgeBase(), self.registry)
+        before = engine.diagnose(GRIPE_PATIENT, max_results=50)
+        self.assertNotIn("NEW_TEST", [r.disease.id for r in before])
+        
+        engine.kb.register_disease(Disease(
+            id="NEW_TEST", name="Nueva", description="Test", category="Test",
+            required_symptoms={"FIEBRE", "FATIGA"}, common_symptoms={"DOLOR_MUSCULAR"}
+        ))
+        after = engine.diagnose(GRIPE_PATIENT, max_results=50)
+        self.assertIn("NEW_TEST", [r.disease.id for r in after])
+    
+    def test_diagnose_sees_changed_parameters(self):
+        """Verifica que cambiar umbrales o pesos invalide los diagnósticos memorizados"""
+        # Motor propio: el compartido por la clase no debe modificarse
+        engine = InferenceEngine(self.kb, self.registry)
+        signature = GRIPE_PATIENT.get_signature()
+        self.assertGreater(len(engine.diagnose(GRIPE_PATIENT)), 0)
+        raw = engine._diagnosis_cache[signature].raw_confidences
+        
+        engine.MIN_CONFIDENCE_THRESHOLD = 1.01
+        self.assertEqual(engine.diagnose(GRIPE_PATIENT), [])
+        
+        engine.MIN_CONFIDENCE_THRESHOLD = 0.25
+        engine.WEIGHT_COMMON = 0.45
+        self.assertGreater(len(engine.diagnose(GRIPE_PATIENT)), 0)
+        self.assertGreater(engine._diagnosis_cache[signature].raw_confidences[0], raw[0])
+    
+    def test_diagnose_returns_independent_sets(self):
+        """Verifica que modificar un resultado no altere los memorizados"""
+        first = self.engine.diagnose(GRIPE_PATIENT, max_results=3)
+        matched = set(first[0].matched_symptoms)
+        missing = set(first[0].missing_key_symptoms)
+        first[0].matched_symptoms.clear()
+        first[0].missing_key_symptoms.add("NO_EXISTE")
+        
+        second = self.engine.diagnose(GRIPE_PATIENT, max_results=3)
+        self.assertEqual(second[0].matched_symptoms, matched)
+        self.assertEqual(second[0].missing_key_symptoms, missing)
 
 
 class TestDiagnosisResult(unittest.TestCase):
     """Pruebas para la clase DiagnosisResult"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.kb = KnowledgeBase()
-        self.disease = self.kb.get_disease("GRIPE")
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen la base)"""
+        cls.kb = fixtures.kb()
+        cls.disease = cls.kb.get_disease("GRIPE")
     
     def test_diagnosis_result_creation(self):
         """Verifica la creación de un resultado de diagnóstico"""
@@ -127,16 +260,24 @@ class TestDiagnosisResult(unittest.TestCase):
         result2 = DiagnosisResult(self.disease, 0.6)
         
         self.assertLess(result2, result1)
+    
+    def test_diagnosis_result_slots(self):
+        """Verifica que los resultados no tengan diccionario por instancia"""
+        result = DiagnosisResult(self.disease, 0.5)
+        self.assertFalse(hasattr(result, "__dict__"))
+        with self.assertRaises(AttributeError):
+            result.extra = True
 
 
 class TestBackwardChaining(unittest.TestCase):
     """Pruebas para backward chaining"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_backward_chain_with_matching_symptoms(self):
         """Verifica backward chaining con síntomas coincidentes"""
@@ -187,11 +328,12 @@ class TestBackwardChaining(unittest.TestCase):
 class TestSeverityCalculation(unittest.TestCase):
     """Pruebas para cálculo de severidad"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_severity_multiplier_moderate(self):
         """Verifica el multiplicador con severidad moderada"""
@@ -221,11 +363,12 @@ class TestSeverityCalculation(unittest.TestCase):
 class TestDurationCalculation(unittest.TestCase):
     """Pruebas para cálculo de duración"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_duration_multiplier_optimal(self):
         """Verifica el multiplicador con duración óptima"""
@@ -254,11 +397,12 @@ class TestDurationCalculation(unittest.TestCase):
 class TestDifferentialDiagnosis(unittest.TestCase):
     """Pruebas para diagnóstico diferencial"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_differential_diagnosis(self):
         """Verifica la generación de diagnóstico diferencial"""
@@ -279,11 +423,12 @@ class TestDifferentialDiagnosis(unittest.TestCase):
 class TestAdditionalTests(unittest.TestCase):
     """Pruebas para sugerencias de pruebas adicionales"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_suggest_tests_with_results(self):
         """Verifica sugerencias con resultados"""
@@ -308,11 +453,12 @@ class TestAdditionalTests(unittest.TestCase):
 class TestSymptomPatternAnalysis(unittest.TestCase):
     """Pruebas para análisis de patrones de síntomas"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_analyze_symptom_patterns(self):
         """Verifica el análisis de patrones"""
@@ -345,23 +491,22 @@ class TestSymptomPatternAnalysis(unittest.TestCase):
 class TestIntegrationInference(unittest.TestCase):
     """Pruebas de integración para el motor de inferencia"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.registry = SymptomRegistry()
-        self.kb = KnowledgeBase()
-        self.engine = InferenceEngine(self.kb, self.registry)
+    @classmethod
+    def setUpClass(cls):
+        """Configuración inicial (compartida: las pruebas solo leen el motor)"""
+        cls.registry = fixtures.registry()
+        cls.kb = fixtures.kb()
+        cls.engine = InferenceEngine(cls.kb, cls.registry)
     
     def test_complete_diagnosis_workflow(self):
         """Prueba un flujo completo de diagnóstico"""
-        # 1. Crear paciente con síntomas
-        patient = PatientSymptoms()
-        patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3)
-        patient.add_symptom("FATIGA", SeverityLevel.GRAVE, 3)
-        patient.add_symptom("DOLOR_MUSCULAR", SeverityLevel.GRAVE, 3)
-        patient.add_symptom("DOLOR_CABEZA", SeverityLevel.MODERADO, 3)
+        # 1. Crear paciente con síntomas (plantilla de gripe sin tos)
+        patient = copy.copy(GRIPE_PATIENT)
+        patient.remove_symptom("TOS_SECA")
         
-        # 2. Realizar diagnóstico
-        results = self.engine.diagnose(patient, max_results=5)
+        # 2. Realizar diagnóstico completo en una sola evaluación
+        bundle = self.engine.diagnose_full(patient, max_results=5)
+        results = bundle.results
         self.assertGreater(len(results), 0)
         
         # 3. Verificar resultado principal
@@ -369,17 +514,15 @@ class TestIntegrationInference(unittest.TestCase):
         self.assertIsNotNone(top_result.disease)
         self.assertGreater(top_result.confidence, 0)
         
-        # 4. Obtener diagnóstico diferencial
-        differential = self.engine.get_differential_diagnosis(patient)
-        self.assertGreater(len(differential), 0)
+        # 4. Diagnóstico diferencial
+        self.assertGreater(len(bundle.differential), 0)
+        self.assertEqual(bundle.differential, self.engine.get_differential_diagnosis(patient))
         
-        # 5. Obtener sugerencias
-        suggestions = self.engine.suggest_additional_tests(results)
-        self.assertGreater(len(suggestions), 0)
+        # 5. Sugerencias
+        self.assertGreater(len(bundle.suggestions), 0)
         
-        # 6. Analizar patrones
-        patterns = self.engine.analyze_symptom_patterns(patient)
-        self.assertIn("total_symptoms", patterns)
+        # 6. Patrones
+        self.assertIn("total_symptoms", bundle.patterns)
     
     def test_edge_case_ambiguous_symptoms(self):
         """Prueba con síntomas ambiguos"""
@@ -393,27 +536,10 @@ class TestIntegrationInference(unittest.TestCase):
         self.assertIsInstance(results, list)
 
 
-def run_tests():
-    """Ejecuta todas las pruebas"""
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Agregar todas las clases de prueba
-    suite.addTests(loader.loadTestsFromTestCase(TestInferenceEngine))
-    suite.addTests(loader.loadTestsFromTestCase(TestDiagnosisResult))
-    suite.addTests(loader.loadTestsFromTestCase(TestBackwardChaining))
-    suite.addTests(loader.loadTestsFromTestCase(TestSeverityCalculation))
-    suite.addTests(loader.loadTestsFromTestCase(TestDurationCalculation))
-    suite.addTests(loader.loadTestsFromTestCase(TestDifferentialDiagnosis))
-    suite.addTests(loader.loadTestsFromTestCase(TestAdditionalTests))
-    suite.addTests(loader.loadTestsFromTestCase(TestSymptomPatternAnalysis))
-    suite.addTests(loader.loadTestsFromTestCase(TestIntegrationInference))
-    
-    # Ejecutar pruebas
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    return result
+def run_tests(workers=None):
+    """Ejecuta todas las pruebas, una clase por proceso"""
+    test_classes = module_test_classes(sys.modules[__name__])
+    return run_test_classes(test_classes, workers=workers)
 
 
 if __name__ == '__main__':
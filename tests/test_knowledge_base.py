@@ -2,25 +2,37 @@
 Pruebas Unitarias para el Módulo de Base de Conocimiento
 """
 
+import io
 import unittest
 import sys
 import os
 import json
 import tempfile
 
+import numpy as np
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from knowledge_base import (
     Disease, DiseaseSeverity, Urgency, KnowledgeBase
 )
 
+try:
+    from tests import _fixtures as fixtures
+    from tests.parallel_runner import module_test_classes, run_test_classes
+except ImportError:
+    # Ejecutado como script desde tests/
+    import _fixtures as fixtures
+    from parallel_runner import module_test_classes, run_test_classes
+
 
 class TestDisease(unittest.TestCase):
     """Pruebas para la clase Disease"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.disease = Disease(
+    @classmethod
+    def setUpClass(cls):
+        """Configuración compartida por las pruebas de la clase"""
+        cls.disease = Disease(
             id="TEST_DISEASE",
             name="Enfermedad de Prueba",
             description="Descripción de prueba",
@@ -56,15 +68,27 @@ class TestDisease(unittest.TestCase):
 class TestKnowledgeBase(unittest.TestCase):
     """Pruebas para la clase KnowledgeBase"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.kb = KnowledgeBase()
+    @classmethod
+    def setUpClass(cls):
+        """Configuración compartida por las pruebas de la clase"""
+        cls.kb = fixtures.kb()
     
     def test_initialization(self):
         """Verifica que la base de conocimiento se inicialice con enfermedades"""
         diseases = self.kb.get_all_diseases()
         self.assertGreater(len(diseases), 0)
     
+    def test_get_all_diseases_cached(self):
+        """Verifica que la tupla de enfermedades se reutilice y se renueve al registrar"""
+        kb = KnowledgeBase()
+        diseases = kb.get_all_diseases()
+        self.assertIsInstance(diseases, tuple)
+        self.assertIs(diseases, kb.get_all_diseases())
+        
+        kb.register_disease(Disease(id="NEW_TEST", name="Nueva", description="Test",
+                                    category="Test", required_symptoms={"SYMPTOM1"}))
+        self.assertEqual(len(kb.get_all_diseases()), len(diseases) + 1)
+    
     def test_get_disease(self):
         """Verifica la obtención de enfermedades por ID"""
         gripe = self.kb.get_disease("GRIPE")
@@ -151,40 +175,83 @@ class TestKnowledgeBase(unittest.TestCase):
             required_symptoms={"SYMPTOM1"}
         )
         
-        self.kb.register_disease(new_disease)
-        retrieved = self.kb.get_disease("NEW_TEST")
+        # Base propia: la compartida por la clase no debe modificarse
+        kb = KnowledgeBase()
+        kb.register_disease(new_disease)
+        retrieved = kb.get_disease("NEW_TEST")
         
         self.assertIsNotNone(retrieved)
         self.assertEqual(retrieved.id, "NEW_TEST")
     
+    def test_disease_index(self):
+        """Verifica el índice de reglas y su reconstrucción al registrar"""
+        kb = KnowledgeBase()
+        index = kb.get_disease_index()
+        self.assertIs(index, kb.get_disease_index())
+        
+        gripe = kb.get_disease("GRIPE")
+        self.assertEqual(index["GRIPE"].required, gripe.required_symptoms)
+        self.assertEqual(index["GRIPE"].excluding, gripe.excluding_symptoms)
+        self.assertIsInstance(index["GRIPE"].common, frozenset)
+        
+        kb.register_disease(Disease(id="NEW_TEST", name="Nueva", description="Test",
+                                    category="Test", required_symptoms={"SYMPTOM1"}))
+        self.assertEqual(kb.get_disease_index()["NEW_TEST"].required, {"SYMPTOM1"})
+    
+    def test_disease_index_interns_ids(self):
+        """Verifica que los IDs del índice estén internados"""
+        runtime_id = "".join(["FIE", "BRE"])
+        required = self.kb.get_disease_index()["GRIPE"].required
+        self.assertIn(runtime_id, required)
+        self.assertTrue(any(symptom_id is sys.intern(runtime_id) for symptom_id in required))
+    
+    def test_rule_matrix(self):
+        """Verifica que la matriz de reglas (int8) refleje las reglas de cada enfermedad"""
+        matrix = self.kb.get_rule_matrix()
+        self.assertEqual(matrix.membership.dtype, np.int8)
+        
+        row = matrix.disease_ids.index("GRIPE")
+        gripe = self.kb.get_disease("GRIPE")
+        required = {s for s, i in matrix.symptom_index.items() if matrix.membership[0, row, i]}
+        self.assertEqual(required, gripe.required_symptoms)
+        self.assertEqual(matrix.sizes[1, row], len(gripe.common_symptoms))
+    
     def test_export_to_json(self):
         """Verifica la exportación a JSON"""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
-            temp_path = f.name
+        buffer = io.StringIO()
+        self.kb.export_to_json(buffer)
+        data = json.loads(buffer.getvalue())
+        
+        # Verificar contenido
+        self.assertIsInstance(data, dict)
+        self.assertGreater(len(data), 0)
         
-        try:
+        # Verificar estructura de una enfermedad
+        for disease_data in data.values():
+            self.assertIn('name', disease_data)
+            self.assertIn('description', disease_data)
+            self.assertIn('category', disease_data)
+            self.assertIn('required_symptoms', disease_data)
+    
+    def test_export_to_json_file(self):
+        """Verifica que la exportación a una ruta escriba el mismo JSON"""
+        buffer = io.StringIO()
+        self.kb.export_to_json(buffer)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = os.path.join(temp_dir, 'kb.json')
             self.kb.export_to_json(temp_path)
-            
-            # Verificar que el archivo existe y es válido
-            self.assertTrue(os.path.exists(temp_path))
-            
             with open(temp_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Verificar contenido
-            self.assertIsInstance(data, dict)
-            self.assertGreater(len(data), 0)
-            
-            # Verificar estructura de una enfermedad
-            for disease_data in data.values():
-                self.assertIn('name', disease_data)
-                self.assertIn('description', disease_data)
-                self.assertIn('category', disease_data)
-                self.assertIn('required_symptoms', disease_data)
-        
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+                self.assertEqual(f.read(), buffer.getvalue())
+
+
+def _assert_string_enum(test, enum_cls, names):
+    """Verifica que la enumeración tenga los miembros dados, con texto no vacío"""
+    test.assertEqual([member.name for member in enum_cls], list(names))
+    for member in enum_cls:
+        with test.subTest(member=member.name):
+            test.assertIsInstance(member.value, str)
+            test.assertGreater(len(member.value), 0)
 
 
 class TestDiseaseSeverity(unittest.TestCase):
@@ -192,16 +259,8 @@ class TestDiseaseSeverity(unittest.TestCase):
     
     def test_severity_values(self):
         """Verifica los valores de severidad de enfermedades"""
-        severities = [
-            DiseaseSeverity.LEVE,
-            DiseaseSeverity.MODERADA,
-            DiseaseSeverity.GRAVE,
-            DiseaseSeverity.EMERGENCIA
-        ]
-        
-        for severity in severities:
-            self.assertIsInstance(severity.value, str)
-            self.assertGreater(len(severity.value), 0)
+        _assert_string_enum(self, DiseaseSeverity,
+                            ("LEVE", "MODERADA", "GRAVE", "EMERGENCIA"))
 
 
 class TestUrgency(unittest.TestCase):
@@ -209,16 +268,8 @@ class TestUrgency(unittest.TestCase):
     
     def test_urgency_values(self):
         """Verifica los valores de urgencia"""
-        urgencies = [
-            Urgency.AUTOCUIDADO,
-            Urgency.CONSULTA_PROGRAMADA,
-            Urgency.CONSULTA_URGENTE,
-            Urgency.EMERGENCIA
-        ]
-        
-        for urgency in urgencies:
-            self.assertIsInstance(urgency.value, str)
-            self.assertGreater(len(urgency.value), 0)
+        _assert_string_enum(self, Urgency, ("AUTOCUIDADO", "CONSULTA_PROGRAMADA",
+                                            "CONSULTA_URGENTE", "EMERGENCIA"))
     
     def test_urgency_order(self):
         """Verifica que las urgencias tengan un orden lógico"""
@@ -237,9 +288,10 @@ class TestUrgency(unittest.TestCase):
 class TestDiseaseValidation(unittest.TestCase):
     """Pruebas de validación de enfermedades específicas"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.kb = KnowledgeBase()
+    @classmethod
+    def setUpClass(cls):
+        """Configuración compartida por las pruebas de la clase"""
+        cls.kb = fixtures.kb()
     
     def test_gripe_configuration(self):
         """Verifica la configuración de la Gripe"""
@@ -287,26 +339,33 @@ class TestDiseaseValidation(unittest.TestCase):
 class TestIntegrationKnowledgeBase(unittest.TestCase):
     """Pruebas de integración para la base de conocimiento"""
     
-    def setUp(self):
-        """Configuración inicial"""
-        self.kb = KnowledgeBase()
+    @classmethod
+    def setUpClass(cls):
+        """Configuración compartida por las pruebas de la clase"""
+        cls.kb = fixtures.kb()
     
     def test_disease_symptom_consistency(self):
         """Verifica que no haya síntomas contradictorios"""
-        for disease in self.kb.get_all_diseases():
-            # Los síntomas requeridos no deben estar en los excluyentes
-            overlap = disease.required_symptoms & disease.excluding_symptoms
-            self.assertEqual(
-                len(overlap), 0,
-                f"Enfermedad {disease.id} tiene síntomas requeridos en excluyentes"
-            )
-            
-            # Los síntomas comunes no deben estar en los excluyentes
-            overlap = disease.common_symptoms & disease.excluding_symptoms
-            self.assertEqual(
-                len(overlap), 0,
-                f"Enfermedad {disease.id} tiene síntomas comunes en excluyentes"
-            )
+        diseases = self.kb.get_all_diseases()
+        # Pares (enfermedad, síntoma) de todas las enfermedades: una sola
+        # intersección global equivale a intersecar enfermedad por enfermedad
+        required = {(d.id, s) for d in diseases for s in d.required_symptoms}
+        common = {(d.id, s) for d in diseases for s in d.common_symptoms}
+        excluding = {(d.id, s) for d in diseases for s in d.excluding_symptoms}
+        
+        # Los síntomas requeridos no deben estar en los excluyentes
+        overlap = required & excluding
+        self.assertEqual(
+            len(overlap), 0,
+            f"Síntomas requeridos en excluyentes: {sorted(overlap)}"
+        )
+        
+        # Los síntomas comunes no deben estar en los excluyentes
+        overlap = common & excluding
+        self.assertEqual(
+            len(overlap), 0,
+            f"Síntomas comunes en excluyentes: {sorted(overlap)}"
+        )
     
     def test_all_diseases_have_treatments(self):
         """Verifica que todas las enfermedades tengan tratamientos"""
@@ -326,24 +385,10 @@ class TestIntegrationKnowledgeBase(unittest.TestCase):
                 )
 
 
-def run_tests():
-    """Ejecuta todas las pruebas"""
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Agregar todas las clases de prueba
-    suite.addTests(loader.loadTestsFromTestCase(TestDisease))
-    suite.addTests(loader.loadTestsFromTestCase(TestKnowledgeBase))
-    suite.addTests(loader.loadTestsFromTestCase(TestDiseaseSeverity))
-    suite.addTests(loader.loadTestsFromTestCase(TestUrgency))
-    suite.addTests(loader.loadTestsFromTestCase(TestDiseaseValidation))
-    suite.addTests(loader.loadTestsFromTestCase(TestIntegrationKnowledgeBase))
-    
-    # Ejecutar pruebas
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    return result
+def run_tests(workers=None):
+    """Ejecuta todas las pruebas, una clase por proceso"""
+    test_classes = module_test_classes(sys.modules[__name__])
+    return run_test_classes(test_classes, workers=workers)
 
 
 if __name__ == '__main__':
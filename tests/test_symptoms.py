@@ -2,40 +2,60 @@
 Pruebas Unitarias para el Módulo de Síntomas
 """
 
+import copy
 import unittest
 import sys
 import os
+import subprocess
+from dataclasses import FrozenInstanceError
+
+import numpy as np
 
 # Agregar el directorio src al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
+import symptoms
+import numba_kernels
 from symptoms import (
     Symptom, SymptomCategory, SeverityLevel, 
-    SymptomRegistry, PatientSymptoms
+    SymptomRegistry, PatientSymptoms, get_default_registry
 )
 
+try:
+    from tests.parallel_runner import module_test_classes, run_test_classes
+except ImportError:
+    # Ejecutado como script desde tests/
+    from parallel_runner import module_test_classes, run_test_classes
+
 
 class TestSymptom(unittest.TestCase):
     """Pruebas para la clase Symptom"""
     
-    def setUp(self):
-        """Configuración inicial para cada prueba"""
-        self.symptom = Symptom(
-            id="TEST_SYMPTOM",
-            name="Síntoma de Prueba",
-            category=SymptomCategory.GENERAL,
-            description="Descripción de prueba",
-            severity_weight=1.5,
-            common_triggers=["trigger1", "trigger2"],
-            related_symptoms={"SYMPTOM1", "SYMPTOM2"}
-        )
+    # Síntoma de prueba compartido: Symptom es inmutable, así que basta con
+    # construirlo una vez para toda la clase
+    SYMPTOM = Symptom(
+        id="TEST_SYMPTOM",
+        name="Síntoma de Prueba",
+        category=SymptomCategory.GENERAL,
+        description="Descripción de prueba",
+        severity_weight=1.5,
+        common_triggers=["trigger1", "trigger2"],
+        related_symptoms={"SYMPTOM1", "SYMPTOM2"}
+    )
+    SYMPTOM_SET = frozenset({SYMPTOM})
     
     def test_symptom_creation(self):
         """Verifica la creación correcta de un síntoma"""
-        self.assertEqual(self.symptom.id, "TEST_SYMPTOM")
-        self.assertEqual(self.symptom.name, "Síntoma de Prueba")
-        self.assertEqual(self.symptom.category, SymptomCategory.GENERAL)
-        self.assertEqual(self.symptom.severity_weight, 1.5)
+        self.assertEqual(self.SYMPTOM.id, "TEST_SYMPTOM")
+        self.assertEqual(self.SYMPTOM.name, "Síntoma de Prueba")
+        self.assertEqual(self.SYMPTOM.category, SymptomCategory.GENERAL)
+        self.assertEqual(self.SYMPTOM.severity_weight, 1.5)
+    
+    def test_symptom_id_is_interned(self):
+        """Verifica que el ID de un síntoma creado en tiempo de ejecución quede internado"""
+        runtime_id = "".join(["NUEVO_", "SINTOMA"])
+        symptom = Symptom(runtime_id, "Nuevo", SymptomCategory.GENERAL, "Prueba")
+        self.assertIs(symptom.id, sys.intern("NUEVO_SINTOMA"))
     
     def test_symptom_hash(self):
         """Verifica que los síntomas se puedan usar en sets"""
@@ -46,10 +66,33 @@ class TestSymptom(unittest.TestCase):
         self.assertEqual(symptom1, symptom2)  # Mismo ID
         self.assertNotEqual(symptom1, symptom3)  # Diferente ID
     
+    def test_symptom_default_containers(self):
+        """Verifica que los contenedores por defecto sean inmutables y compartidos"""
+        symptom1 = Symptom("ID1", "Name1", SymptomCategory.GENERAL, "Desc1")
+        symptom2 = Symptom("ID2", "Name2", SymptomCategory.GENERAL, "Desc2")
+        
+        self.assertEqual(symptom1.common_triggers, ())
+        self.assertEqual(symptom1.related_symptoms, frozenset())
+        self.assertIs(symptom1.related_symptoms, symptom2.related_symptoms)
+    
+    def test_symptom_normalizes_containers(self):
+        """Verifica que listas y sets se conviertan a tuple y frozenset"""
+        symptom = Symptom("ID1", "Name1", SymptomCategory.GENERAL, "Desc1", 1.0,
+                          ["estrés", "frío"], {"ID2"})
+        self.assertEqual(symptom.common_triggers, ("estrés", "frío"))
+        self.assertEqual(symptom.related_symptoms, frozenset({"ID2"}))
+        self.assertIsInstance(symptom.related_symptoms, frozenset)
+    
+    def test_symptom_is_frozen_and_slotted(self):
+        """Verifica que los síntomas sean inmutables y sin __dict__"""
+        symptom = Symptom("ID1", "Name1", SymptomCategory.GENERAL, "Desc1")
+        self.assertFalse(hasattr(symptom, "__dict__"))
+        with self.assertRaises(FrozenInstanceError):
+            symptom.severity_weight = 2.0
+    
     def test_symptom_in_set(self):
         """Verifica que los síntomas funcionen correctamente en sets"""
-        symptom_set = {self.symptom}
-        self.assertIn(self.symptom, symptom_set)
+        self.assertIn(self.SYMPTOM, self.SYMPTOM_SET)
 
 
 class TestSymptomRegistry(unittest.TestCase):
@@ -57,6 +100,9 @@ class TestSymptomRegistry(unittest.TestCase):
     
     def setUp(self):
         """Configuración inicial"""
+        # Registro propio por prueba: varias pruebas registran síntomas. No
+        # recarga el catálogo: comparte las tablas precalculadas y solo las
+        # copia al registrar el primer síntoma
         self.registry = SymptomRegistry()
     
     def test_registry_initialization(self):
@@ -64,16 +110,88 @@ class TestSymptomRegistry(unittest.TestCase):
         symptoms = self.registry.get_all_symptoms()
         self.assertGreater(len(symptoms), 0)
     
+    def test_all_symptoms_tuple_is_cached(self):
+        """Verifica que la tupla de síntomas se reutilice hasta registrar uno nuevo"""
+        all_symptoms = self.registry.get_all_symptoms()
+        self.assertIsInstance(all_symptoms, tuple)
+        self.assertIs(all_symptoms, self.registry.get_all_symptoms())
+        
+        self.registry.register_symptom(Symptom("NUEVO", "Nuevo", SymptomCategory.GENERAL, "Prueba"))
+        self.assertEqual(len(self.registry.get_all_symptoms()), len(all_symptoms) + 1)
+    
+    def test_registry_uses_slots(self):
+        """Verifica que el registro no reserve un __dict__ por instancia"""
+        self.assertFalse(hasattr(self.registry, "__dict__"))
+    
+    def test_default_registry_is_shared(self):
+        """Verifica que el registro por defecto se construya una sola vez"""
+        registry = get_default_registry()
+        self.assertIs(registry, get_default_registry())
+        self.assertIsNotNone(registry.get_symptom("FIEBRE"))
+    
+    def test_registry_shares_derived_indexes(self):
+        """Verifica que los índices derivados se compartan sin filtrar altas"""
+        other = SymptomRegistry()
+        self.assertIs(self.registry._related, other._related)
+        other.register_symptom(Symptom("NUEVO", "Nuevo", SymptomCategory.GENERAL,
+                                       "Síntoma de prueba", related_symptoms=frozenset({"FIEBRE"})))
+        self.assertIsNotNone(other.get_symptom("NUEVO"))
+        self.assertIsNone(self.registry.get_symptom("NUEVO"))
+        self.assertEqual(self.registry.get_related_symptoms("NUEVO"), [])
+        self.assertEqual(len(SymptomRegistry()), len(self.registry))
+    
+    def test_shared_tables_copy_on_write(self):
+        """Verifica que las tablas compartidas se copien al registrar"""
+        shared = SymptomRegistry()
+        private = SymptomRegistry(share=False)
+        self.assertIs(shared.symptoms, self.registry.symptoms)
+        self.assertIsNot(private.symptoms, self.registry.symptoms)
+        
+        shared.register_symptom(Symptom("NUEVO", "Nuevo", SymptomCategory.GENERAL, "Prueba"))
+        self.assertIsNot(shared.symptoms, self.registry.symptoms)
+        self.assertIn("NUEVO", shared)
+        self.assertNotIn("NUEVO", self.registry)
+        self.assertNotIn("NUEVO", SymptomRegistry())
+    
+    def test_symptoms_table_is_read_only(self):
+        """Verifica que la tabla pública de síntomas sea de solo lectura"""
+        with self.assertRaises(TypeError):
+            self.registry.symptoms["NUEVO"] = self.registry.get_symptom("FIEBRE")
+        self.assertIs(self.registry.symptoms["FIEBRE"], self.registry.get_symptom("FIEBRE"))
+        
+        self.registry.register_symptom(Symptom("NUEVO", "Nuevo", SymptomCategory.GENERAL, "Prueba"))
+        self.assertIn("NUEVO", self.registry.symptoms)
+    
     def test_get_symptom(self):
         """Verifica la obtención de síntomas por ID"""
         symptom = self.registry.get_symptom("FIEBRE")
         self.assertIsNotNone(symptom)
         self.assertEqual(symptom.id, "FIEBRE")
     
+    def test_get_symptom_names(self):
+        """Verifica la obtención de nombres ignorando IDs desconocidos"""
+        names = self.registry.get_symptom_names(["FIEBRE", "NONEXISTENT", "TOS_SECA"])
+        self.assertEqual(names, [self.registry["FIEBRE"].name, self.registry["TOS_SECA"].name])
+    
+    def test_registry_mapping_access(self):
+        """Verifica el acceso por índice e iteración en orden de registro"""
+        self.assertIn("FIEBRE", self.registry)
+        self.assertNotIn("NONEXISTENT", self.registry)
+        self.assertEqual(self.registry["FIEBRE"].id, "FIEBRE")
+        self.assertEqual(len(self.registry), len(self.registry.get_all_symptoms()))
+        self.assertEqual(tuple(self.registry), self.registry.get_all_symptoms())
+        
+        with self.assertRaises(KeyError):
+            self.registry["NONEXISTENT"]
+    
     def test_get_nonexistent_symptom(self):
         """Verifica el manejo de síntomas inexistentes"""
         symptom = self.registry.get_symptom("NONEXISTENT")
         self.assertIsNone(symptom)
+        
+        missing = Symptom("_MISSING", "", SymptomCategory.GENERAL, "", severity_weight=0.0)
+        self.assertIs(self.registry.get_symptom("NONEXISTENT", missing), missing)
+        self.assertEqual(self.registry.get_symptom("FIEBRE", missing).id, "FIEBRE")
     
     def test_get_symptoms_by_category(self):
         """Verifica la obtención de síntomas por categoría"""
@@ -84,6 +202,17 @@ class TestSymptomRegistry(unittest.TestCase):
         for symptom in respiratory:
             self.assertEqual(symptom.category, SymptomCategory.RESPIRATORIO)
     
+    def test_category_buckets_follow_registration(self):
+        """Verifica que las categorías reflejen altas y reemplazos de síntomas"""
+        self.assertIsInstance(self.registry.get_symptoms_by_category(SymptomCategory.GENERAL), tuple)
+        
+        self.registry.register_symptom(Symptom("FIEBRE", "Fiebre", SymptomCategory.DERMATOLOGICO,
+                                               "Temperatura elevada"))
+        general_ids = [s.id for s in self.registry.get_symptoms_by_category(SymptomCategory.GENERAL)]
+        derm_ids = [s.id for s in self.registry.get_symptoms_by_category(SymptomCategory.DERMATOLOGICO)]
+        self.assertNotIn("FIEBRE", general_ids)
+        self.assertIn("FIEBRE", derm_ids)
+    
     def test_search_symptoms(self):
         """Verifica la búsqueda de síntomas"""
         results = self.registry.search_symptoms("cabeza")
@@ -96,6 +225,51 @@ class TestSymptomRegistry(unittest.TestCase):
                 "cabeza" in symptom.description.lower()
             )
     
+    def test_search_matches_linear_scan(self):
+        """Verifica que el índice de búsqueda coincida con un recorrido lineal"""
+        for query in ["", "a", "Dolor de", "ABEZ", "tos seca", "fiebre alta", "xyz", "-",
+                      "FIEBRE", "náuseas", "dolor_"]:
+            expected = [
+                s for s in self.registry.get_all_symptoms()
+                if query.lower() in s.name.lower() or query.lower() in s.description.lower()
+            ]
+            self.assertEqual(self.registry.search_symptoms(query), expected, query)
+    
+    def test_search_empty_query_returns_copy(self):
+        """Verifica que la búsqueda vacía devuelva una lista nueva con todos los síntomas"""
+        results = self.registry.search_symptoms("")
+        self.assertEqual(results, list(self.registry.get_all_symptoms()))
+        results.clear()
+        self.assertEqual(len(self.registry.search_symptoms("")), len(self.registry))
+    
+    def test_search_includes_registered_symptom(self):
+        """Verifica que el índice de búsqueda incluya síntomas registrados después"""
+        self.registry.register_symptom(Symptom("ZUMBIDO", "Zumbido de oídos", SymptomCategory.OTORRINOLARINGOLOGICO,
+                                               "Percepción de ruido sin fuente externa"))
+        self.assertEqual([s.id for s in self.registry.search_symptoms("zumbido")], ["ZUMBIDO"])
+    
+    def test_search_results_are_memoized(self):
+        """Verifica que las búsquedas se memoricen y se invaliden al registrar"""
+        first = self.registry.search_symptoms("Zumb")
+        self.assertEqual(first, [])
+        first.append(None)
+        self.assertEqual(self.registry.search_symptoms("zumb"), [])
+        self.assertIn("zumb", self.registry._search_cache)
+        
+        self.registry.register_symptom(Symptom("ZUMBIDO", "Zumbido de oídos", SymptomCategory.OTORRINOLARINGOLOGICO,
+                                               "Percepción de ruido sin fuente externa"))
+        self.assertEqual([s.id for s in self.registry.search_symptoms("zumb")], ["ZUMBIDO"])
+    
+    def test_get_symptoms_by_trigger(self):
+        """Verifica la búsqueda de síntomas por desencadenante"""
+        results = self.registry.get_symptoms_by_trigger("Alergia")
+        self.assertGreater(len(results), 0)
+        
+        for symptom in results:
+            self.assertIn("alergia", symptom.common_triggers)
+        
+        self.assertEqual(self.registry.get_symptoms_by_trigger("inexistente"), [])
+    
     def test_register_new_symptom(self):
         """Verifica el registro de nuevos síntomas"""
         new_symptom = Symptom(
@@ -108,49 +282,148 @@ class TestSymptomRegistry(unittest.TestCase):
         
         self.assertIsNotNone(retrieved)
         self.assertEqual(retrieved.id, "NEW_TEST")
+    
+    def test_known_ids(self):
+        """Verifica el conjunto de IDs y su renovación al registrar"""
+        known = self.registry.known_ids
+        self.assertIsInstance(known, frozenset)
+        self.assertIs(known, self.registry.known_ids)
+        self.assertEqual(known, set(self.registry.symptoms))
+        
+        self.registry.register_symptom(
+            Symptom("NEW_TEST", "Nuevo Síntoma", SymptomCategory.GENERAL, "Descripción")
+        )
+        self.assertIn("NEW_TEST", self.registry.known_ids)
+        self.assertNotIn("NEW_TEST", known)
+    
+    def test_get_related_symptoms(self):
+        """Verifica que los síntomas relacionados se resuelvan a objetos"""
+        related = self.registry.get_related_symptoms("FIEBRE")
+        self.assertGreater(len(related), 0)
+        
+        for symptom in related:
+            self.assertIsInstance(symptom, Symptom)
+            self.assertIn(symptom.id, self.registry.get_symptom("FIEBRE").related_symptoms)
+    
+    def test_related_mask_intersection(self):
+        """Verifica la intersección de síntomas relacionados mediante bitmasks"""
+        # FIEBRE se relaciona con ESCALOFRIOS y FATIGA, no con NAUSEAS
+        present = ["ESCALOFRIOS", "FATIGA", "NAUSEAS"]
+        self.assertEqual(self.registry.count_related_present("FIEBRE", present), 2)
+        self.assertEqual(self.registry.count_related_present("NONEXISTENT", present), 0)
+    
+    def test_related_graph_csr(self):
+        """Verifica que el grafo CSR coincida con los síntomas relacionados"""
+        indptr, indices = self.registry.get_related_graph()
+        self.assertEqual(len(indptr), len(self.registry) + 1)
+        self.assertEqual(indices.dtype, np.int32)
+        
+        fever = self.registry.get_symptom_index("FIEBRE")
+        expected = sorted(self.registry.get_symptom_index(s.id)
+                          for s in self.registry.get_related_symptoms("FIEBRE"))
+        self.assertEqual(self.registry.neighbors(fever).tolist(), expected)
+    
+    def test_weight_vector_score(self):
+        """Verifica el puntaje vectorizado sobre índices densos"""
+        indices = self.registry.get_symptom_indices(["FIEBRE", "TOS_SECA", "NONEXISTENT"])
+        self.assertEqual(len(indices), 2)
+        
+        expected = (self.registry.get_symptom("FIEBRE").severity_weight +
+                    self.registry.get_symptom("TOS_SECA").severity_weight)
+        self.assertAlmostEqual(self.registry.score(indices), expected, places=5)
+    
+    def test_catalog_shares_equal_related_sets(self):
+        """Verifica que los conjuntos de relacionados iguales se compartan al cargar"""
+        records = [
+            {"id": symptom_id, "name": symptom_id, "category": "GENERAL",
+             "description": symptom_id, "severity_weight": 1.0,
+             "common_triggers": [], "related_symptoms": related}
+            for symptom_id, related in (("A", ["X", "Y"]), ("B", ["Y", "X"]))
+        ]
+        catalog = symptoms._build_symptom_catalog(records)
+        
+        self.assertIs(catalog[0].related_symptoms, catalog[1].related_symptoms)
+        self.assertEqual(catalog[0].related_symptoms, {"X", "Y"})
+    
+    def test_catalog_loaded_on_first_use(self):
+        """Verifica que importar el módulo no cargue el catálogo"""
+        src_dir = os.path.dirname(symptoms.__file__)
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import symptoms; print(symptoms._catalog_tables.cache_info().currsize)"],
+            cwd=src_dir, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), "0")
+        self.assertIs(symptoms._catalog_tables(), symptoms._catalog_tables())
+    
+    def test_index_catalog_single_pass(self):
+        """Verifica que el indexado del catálogo coincida con el orden y las categorías"""
+        catalog = symptoms._catalog_tables()[0]
+        table, index, by_category = symptoms._index_catalog(catalog)
+        
+        self.assertEqual(list(table), [s.id for s in catalog])
+        self.assertEqual([index[s.id] for s in catalog], list(range(len(catalog))))
+        for category, bucket in by_category.items():
+            self.assertEqual(bucket, tuple(s for s in catalog if s.category == category))
+    
+    def test_invalid_related_reference(self):
+        """Verifica que una referencia inexistente se detecte al validar"""
+        self.registry.register_symptom(Symptom(
+            "BROKEN_REF", "Referencia rota", SymptomCategory.GENERAL,
+            "Descripción", related_symptoms={"NO_EXISTE"}
+        ))
+        
+        with self.assertRaises(ValueError):
+            self.registry._link_related_symptoms(validate=True)
 
 
 class TestPatientSymptoms(unittest.TestCase):
     """Pruebas para la clase PatientSymptoms"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Registro compartido de solo lectura (estas pruebas no registran síntomas)"""
+        cls.registry = get_default_registry()
+    
     def setUp(self):
         """Configuración inicial"""
         self.patient = PatientSymptoms()
-        self.registry = SymptomRegistry()
     
-    def test_add_symptom(self):
-        """Verifica la adición de síntomas"""
-        self.patient.add_symptom(
-            "FIEBRE", 
-            SeverityLevel.GRAVE, 
-            3, 
-            "Nota de prueba"
-        )
-        
-        self.assertTrue(self.patient.has_symptom("FIEBRE"))
-        self.assertEqual(self.patient.get_symptom_count(), 1)
+    # (síntoma, severidad, duración, nota) agregados y eliminados uno a uno
+    LIFECYCLE_CASES = (
+        ("FIEBRE", SeverityLevel.GRAVE, 3, "Nota de prueba"),
+        ("FIEBRE", SeverityLevel.MODERADO, 2, ""),
+        ("FIEBRE", SeverityLevel.MODERADO, 5, ""),
+        ("TOS_SECA", SeverityLevel.LEVE, 1, ""),
+    )
     
-    def test_remove_symptom(self):
-        """Verifica la eliminación de síntomas"""
-        self.patient.add_symptom("FIEBRE", SeverityLevel.MODERADO, 2)
-        self.patient.remove_symptom("FIEBRE")
-        
-        self.assertFalse(self.patient.has_symptom("FIEBRE"))
-        self.assertEqual(self.patient.get_symptom_count(), 0)
+    def test_add_get_and_remove_symptom(self):
+        """Verifica la adición, consulta de severidad/duración/nota y eliminación de síntomas"""
+        for symptom_id, severity, duration, note in self.LIFECYCLE_CASES:
+            with self.subTest(symptom=symptom_id, severity=severity.name, duration=duration):
+                self.patient.add_symptom(symptom_id, severity, duration, note)
+                self.assertTrue(self.patient.has_symptom(symptom_id))
+                self.assertEqual(self.patient.get_symptom_count(), 1)
+                self.assertEqual(self.patient.get_severity(symptom_id), severity)
+                self.assertEqual(self.patient.get_duration(symptom_id), duration)
+                self.assertEqual(self.patient.get_note(symptom_id), note)
+                
+                self.patient.remove_symptom(symptom_id)
+                self.assertFalse(self.patient.has_symptom(symptom_id))
+                self.assertEqual(self.patient.get_symptom_count(), 0)
     
-    def test_get_severity(self):
-        """Verifica la obtención de severidad"""
-        self.patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3)
-        severity = self.patient.get_severity("FIEBRE")
-        
-        self.assertEqual(severity, SeverityLevel.GRAVE)
+    def test_patient_uses_slots(self):
+        """Verifica que el reporte del paciente no reserve un __dict__"""
+        self.assertFalse(hasattr(self.patient, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.patient.extra = True
     
-    def test_get_duration(self):
-        """Verifica la obtención de duración"""
-        self.patient.add_symptom("FIEBRE", SeverityLevel.MODERADO, 5)
-        duration = self.patient.get_duration("FIEBRE")
+    def test_symptom_ids_are_interned(self):
+        """Verifica que los IDs del catálogo y del paciente estén internados"""
+        registry_id = self.registry.get_symptom("FIEBRE").id
+        self.patient.add_symptom("".join(["FIE", "BRE"]))
         
-        self.assertEqual(duration, 5)
+        self.assertIs(next(iter(self.patient.symptoms)), registry_id)
     
     def test_calculate_severity_score(self):
         """Verifica el cálculo de score de severidad"""
@@ -160,6 +433,134 @@ class TestPatientSymptoms(unittest.TestCase):
         score = self.patient.calculate_severity_score(self.registry)
         self.assertGreater(score, 0)
     
+    def test_severity_score_matches_weights(self):
+        """Verifica que el score sea la suma ponderada e ignore IDs desconocidos"""
+        self.assertEqual(self.patient.calculate_severity_score(self.registry), 0.0)
+        self.patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3)
+        self.patient.add_symptom("TOS_SECA", SeverityLevel.LEVE, 2)
+        self.patient.add_symptom("DESCONOCIDO", SeverityLevel.CRITICO, 1)
+        
+        expected = (self.registry.get_symptom("FIEBRE").severity_weight * 3 +
+                    self.registry.get_symptom("TOS_SECA").severity_weight * 1)
+        score = self.patient.calculate_severity_score(self.registry)
+        self.assertIsInstance(score, float)
+        self.assertAlmostEqual(score, expected)
+    
+    def test_severity_score_tracks_updates(self):
+        """Verifica que el score refleje severidades actualizadas o eliminadas"""
+        weight = self.registry.get_symptom("FIEBRE").severity_weight
+        self.patient.add_symptom("FIEBRE", SeverityLevel.LEVE)
+        self.patient.add_symptom("FIEBRE", SeverityLevel.CRITICO)
+        self.assertAlmostEqual(self.patient.calculate_severity_score(self.registry), weight * 4)
+        
+        self.patient.remove_symptom("FIEBRE")
+        self.assertEqual(self.patient.calculate_severity_score(self.registry), 0.0)
+    
+    def test_single_record_per_symptom(self):
+        """Verifica que severidad, duración y nota se guarden en un solo registro"""
+        self.patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 4, "Por la noche")
+        self.patient.add_symptom("FIEBRE", SeverityLevel.LEVE, 6)
+        self.patient.add_symptom("TOS_SECA", SeverityLevel.MODERADO, 2)
+        
+        self.assertEqual(list(self.patient.entries), ["FIEBRE", "TOS_SECA"])
+        self.assertEqual(self.patient.get_severity("FIEBRE"), SeverityLevel.LEVE)
+        self.assertEqual(self.patient.get_duration("FIEBRE"), 6)
+        self.assertEqual(self.patient.get_note("FIEBRE"), "Por la noche")
+        self.assertEqual(self.patient.get_note("TOS_SECA", "-"), "-")
+        self.assertEqual(self.patient.notes, {"FIEBRE": "Por la noche"})
+        self.assertEqual({"FIEBRE", "CONGESTION_NASAL"} & self.patient.symptoms, {"FIEBRE"})
+    
+    def test_severity_score_cache_invalidation(self):
+        """Verifica que el score en caché se invalide al modificar el reporte o el registro"""
+        registry = SymptomRegistry()
+        self.patient.add_symptom("FIEBRE", SeverityLevel.GRAVE)
+        first = self.patient.calculate_severity_score(registry)
+        self.assertEqual(self.patient.calculate_severity_score(registry), first)
+        
+        self.patient.add_symptom("TOS_SECA", SeverityLevel.LEVE)
+        second = self.patient.calculate_severity_score(registry)
+        self.assertGreater(second, first)
+        
+        registry.register_symptom(Symptom("TOS_SECA", "Tos seca", SymptomCategory.RESPIRATORIO,
+                                          "Tos sin flema", severity_weight=10.0))
+        self.assertAlmostEqual(self.patient.calculate_severity_score(registry), first + 10.0)
+        self.assertAlmostEqual(self.patient.calculate_severity_score(self.registry), second)
+    
+    def test_score_many_matches_single_scores(self):
+        """Verifica que el cálculo por lotes coincida con el cálculo individual"""
+        other = PatientSymptoms()
+        other.add_symptom("TOS_SECA", SeverityLevel.LEVE)
+        other.add_symptom("DESCONOCIDO", SeverityLevel.GRAVE)
+        self.patient.add_symptom("FIEBRE", SeverityLevel.CRITICO)
+        patients = [self.patient, PatientSymptoms(), other]
+        
+        scores = self.registry.score_many(patients)
+        self.assertEqual(scores.dtype, np.float64)
+        for score, patient in zip(scores, patients):
+            self.assertAlmostEqual(score, patient.calculate_severity_score(self.registry))
+        self.assertEqual(len(self.registry.score_many([])), 0)
+    
+    @unittest.skipUnless(numba_kernels.NUMBA_AVAILABLE, "numba no está instalado")
+    def test_jit_accumulate_matches_numpy(self):
+        """Verifica que el núcleo compilado coincida con la acumulación NumPy"""
+        rows = np.array([0, 0, 2], dtype=np.intp)
+        columns = np.array([1, 3, 1], dtype=np.intp)
+        severities = np.array([2.0, 4.0, 1.0])
+        weights = np.array([1.0, 1.5, 0.5, 2.0])
+        
+        scores = numba_kernels.accumulate_scores(rows, columns, severities, weights, 3)
+        expected = np.bincount(rows, weights=weights[columns] * severities, minlength=3)
+        np.testing.assert_allclose(scores, expected)
+    
+    def test_patient_symptom_mask(self):
+        """Verifica el bitmask de síntomas del paciente"""
+        self.patient.add_symptom("FIEBRE")
+        self.patient.add_symptom("FATIGA")
+        self.patient.add_symptom("DESCONOCIDO")
+        
+        mask = self.patient.get_symptom_mask(self.registry)
+        self.assertEqual(mask.bit_count(), 2)
+        self.assertTrue(mask >> self.registry.get_symptom_index("FIEBRE") & 1)
+        self.assertEqual((mask & self.registry.get_related_mask("FIEBRE")).bit_count(),
+                         self.registry.count_related_present("FIEBRE", self.patient.symptoms))
+    
+    def test_add_symptoms(self):
+        """Verifica la carga en lote de síntomas"""
+        self.patient.add_symptom("FIEBRE", SeverityLevel.LEVE, 1, "Previa")
+        self.patient.add_symptoms([
+            ("FIEBRE", SeverityLevel.GRAVE, 3),
+            ("TOS_SECA", SeverityLevel.MODERADO, 2, "Nocturna"),
+            ("FATIGA", SeverityLevel.LEVE, 1, None),
+        ])
+        
+        self.assertEqual(self.patient.get_symptom_count(), 3)
+        self.assertEqual(self.patient.get_severity("FIEBRE"), SeverityLevel.GRAVE)
+        self.assertEqual(self.patient.get_note("FIEBRE"), "Previa")
+        self.assertEqual(self.patient.get_note("TOS_SECA"), "Nocturna")
+        self.assertEqual(self.patient.get_duration("FATIGA"), 1)
+    
+    def test_copy_is_independent(self):
+        """Verifica que copy.copy produzca un reporte independiente"""
+        self.patient.add_symptom("FIEBRE", SeverityLevel.GRAVE, 3, "Alta")
+        clone = copy.copy(self.patient)
+        
+        clone.add_symptom("FIEBRE", SeverityLevel.LEVE, 1)
+        clone.add_symptom("FATIGA")
+        self.assertEqual(self.patient.get_severity("FIEBRE"), SeverityLevel.GRAVE)
+        self.assertFalse(self.patient.has_symptom("FATIGA"))
+        self.assertEqual(clone.get_note("FIEBRE"), "Alta")
+    
+    def test_count_in_category(self):
+        """Verifica el conteo de síntomas por categoría mediante bitmasks"""
+        self.patient.add_symptom("TOS_SECA")
+        self.patient.add_symptom("CONGESTION_NASAL")
+        self.patient.add_symptom("FIEBRE")
+        
+        for category in SymptomCategory:
+            expected = sum(1 for s in self.patient.symptoms
+                           if self.registry.get_symptom(s).category == category)
+            self.assertEqual(self.patient.count_in_category(self.registry, category), expected)
+    
     def test_clear_symptoms(self):
         """Verifica la limpieza de síntomas"""
         self.patient.add_symptom("FIEBRE", SeverityLevel.MODERADO, 2)
@@ -200,6 +601,12 @@ class TestSeverityLevel(unittest.TestCase):
         """Verifica la comparación de niveles de severidad"""
         self.assertLess(SeverityLevel.LEVE.value, SeverityLevel.GRAVE.value)
         self.assertGreater(SeverityLevel.CRITICO.value, SeverityLevel.MODERADO.value)
+    
+    def test_severity_behaves_as_int(self):
+        """Verifica que los niveles operen directamente como enteros"""
+        self.assertLess(SeverityLevel.LEVE, SeverityLevel.GRAVE)
+        self.assertEqual(SeverityLevel.GRAVE * 1.5, 4.5)
+        self.assertEqual(sum(SeverityLevel), 10)
 
 
 class TestSymptomCategory(unittest.TestCase):
@@ -215,16 +622,32 @@ class TestSymptomCategory(unittest.TestCase):
         ]
         
         for category in categories:
-            self.assertIsInstance(category.value, str)
-            self.assertGreater(len(category.value), 0)
+            self.assertIsInstance(category.value, int)
+            self.assertIsInstance(category.label, str)
+            self.assertGreater(len(category.label), 0)
+    
+    def test_category_from_label(self):
+        """Verifica la búsqueda de categorías por etiqueta"""
+        for category in SymptomCategory:
+            self.assertIs(SymptomCategory.from_label(category.label), category)
+        self.assertIsNone(SymptomCategory.from_label("Todos"))
+    
+    def test_category_dense_values(self):
+        """Verifica que los valores sirvan como índice denso"""
+        values = sorted(category.value for category in SymptomCategory)
+        self.assertEqual(values, list(range(len(SymptomCategory))))
 
 
 class TestIntegrationSymptoms(unittest.TestCase):
     """Pruebas de integración para el módulo de síntomas"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Registro compartido de solo lectura"""
+        cls.registry = get_default_registry()
+    
     def setUp(self):
         """Configuración inicial"""
-        self.registry = SymptomRegistry()
         self.patient = PatientSymptoms()
     
     def test_complete_workflow(self):
@@ -251,32 +674,19 @@ class TestIntegrationSymptoms(unittest.TestCase):
         """Verifica que los síntomas relacionados estén definidos"""
         fiebre = self.registry.get_symptom("FIEBRE")
         
-        if fiebre.related_symptoms:
-            for related_id in fiebre.related_symptoms:
-                related = self.registry.get_symptom(related_id)
-                # Puede ser None si es un síntoma suplementario
-                # pero no debe fallar
+        # Los relacionados ya vienen resueltos a objetos; los IDs que no están
+        # registrados (síntomas suplementarios) se omiten sin fallar
+        related = self.registry.get_related_symptoms("FIEBRE")
+        self.assertEqual(
+            {symptom.id for symptom in related},
+            fiebre.related_symptoms & self.registry.known_ids
+        )
 
 
-def run_tests():
-    """Ejecuta todas las pruebas"""
-    # Crear suite de pruebas
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Agregar todas las clases de prueba
-    suite.addTests(loader.loadTestsFromTestCase(TestSymptom))
-    suite.addTests(loader.loadTestsFromTestCase(TestSymptomRegistry))
-    suite.addTests(loader.loadTestsFromTestCase(TestPatientSymptoms))
-    suite.addTests(loader.loadTestsFromTestCase(TestSeverityLevel))
-    suite.addTests(loader.loadTestsFromTestCase(TestSymptomCategory))
-    suite.addTests(loader.loadTestsFromTestCase(TestIntegrationSymptoms))
-    
-    # Ejecutar pruebas
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    return result
+def run_tests(workers=None):
+    """Ejecuta todas las pruebas, una clase por proceso"""
+    test_classes = module_test_classes(sys.modules[__name__])
+    return run_test_classes(test_classes, workers=workers)
 
 
 if __name__ == '__main__':